@@ -1,56 +1,184 @@
+import os  # Importing os to locate the task database next to this script
+import sqlite3  # Importing sqlite3 to keep tasks between runs
+from datetime import date  # Importing date to validate due dates
 from tkinter import messagebox  # Importing messagebox for displaying notifications and warnings
 import customtkinter as ctk  # Importing customtkinter for a modern, styled GUI
 
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "todo.db")  # Where the tasks are stored
+VISIBLE_ROWS = 5  # Row widgets in the list; only this many tasks are ever drawn, however long the list is
+ROW_HEIGHT = 60  # Fixed row height, so the rows fill the 300px list area exactly
+DESCRIPTION_CHARS = 90  # Longer descriptions are cut to fit a row; clicking the row shows the full text
+
+# Class to store tasks in SQLite so they survive restarts
+class TaskStore:
+    def __init__(self, path=DB_PATH):
+        self.connection = sqlite3.connect(path)  # Open (or create) the database file
+        self.connection.execute("PRAGMA journal_mode=WAL")  # Writes append to a log instead of rewriting pages
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'open',
+                due_date TEXT,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status);
+            CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date);
+        """)  # Indexes keep lookups by status and due date fast as the list grows
+
+    # Function to add a task and return its id
+    def add(self, title, description, due_date=None):
+        with self.connection:  # Commit the insert as one transaction
+            cursor = self.connection.execute(
+                "INSERT INTO tasks (title, description, due_date) VALUES (?, ?, ?)", (title, description, due_date))
+        return cursor.lastrowid
+
+    # Function to delete a task by id
+    def remove(self, task_id):
+        with self.connection:
+            self.connection.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    # Function to get the most recently added task, or None when there are no tasks
+    def last(self):
+        return self.connection.execute(
+            "SELECT id, title, description, due_date FROM tasks ORDER BY id DESC LIMIT 1").fetchone()
+
+    # Function to get one page of tasks, in the order they were added
+    def page(self, offset, limit):
+        return self.connection.execute(
+            "SELECT id, title, description, due_date FROM tasks ORDER BY id LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+
+    # Function to count the tasks
+    def count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    # Function to close the database connection
+    def close(self):
+        self.connection.close()
+
 # Function to create and manage the to-do list
 def todo_list():
     # Function to add a task to the task list
     def add_task():
+        nonlocal total_tasks, first_row
         task = task_entry.get()  # Get the task name from the task entry field
         description = description_entry.get("1.0", "end").strip()  # Get the description from the description text box
+        due_date = due_entry.get().strip() or None  # Get the optional due date
+        if due_date:
+            try:
+                due_date = date.fromisoformat(due_date).isoformat()  # Store dates as YYYY-MM-DD so they sort correctly
+            except ValueError:
+                messagebox.showwarning("Warning", "Due date must look like YYYY-MM-DD!")  # Show a warning for a bad date
+                return
         if task.strip() and description.strip():  # Check if task and description are not empty
-            tasks.append((task, description))  # Add the task and description as a tuple to the task list
-            update_task_list()  # Update the task list display
+            store.add(task, description, due_date)  # Save the task in the database
+            total_tasks += 1
+            first_row = total_tasks - VISIBLE_ROWS  # Scroll to the end so the new task is visible
+            render_rows()  # Redraw the visible rows only
             task_entry.delete(0, "end")  # Clear the task entry field
+            due_entry.delete(0, "end")  # Clear the due date field
             description_entry.delete("1.0", "end")  # Clear the description text box
             messagebox.showinfo("Task Added", "Task added successfully!")  # Show a success message
         else:
             # Show a warning if the task or description is empty
             messagebox.showwarning("Warning", "Task and description cannot be empty!")
 
-    # Function to update the task list display
-    def update_task_list():
-        for widget in task_list_frame.winfo_children():  # Iterate through all child widgets in the task list frame
-            widget.destroy()  # Remove each widget to refresh the frame
-
-        for i, (task, description) in enumerate(tasks, 1):  # Loop through the tasks with their index
-            # Create a frame for each task
-            task_frame = ctk.CTkFrame(task_list_frame, fg_color="#2E3B4E", corner_radius=10)
-            task_frame.pack(pady=5, fill="x", padx=10)  # Add padding and stretch horizontally
-
-            # Display the task title
-            task_label = ctk.CTkLabel(task_frame, text=f"{i}. {task}", font=("Helvetica", 16, "bold"))
-            task_label.pack(anchor="w", padx=10, pady=5)  # Align the label to the left with padding
+    # Function to create one reusable row widget; the pool of rows is filled with whichever tasks are in view
+    def create_row(index):
+        # Create a fixed-height frame for the row
+        row_frame = ctk.CTkFrame(list_frame, fg_color="#2E3B4E", corner_radius=10, height=ROW_HEIGHT - 6)
+        row_frame.grid(row=index, column=0, sticky="ew", padx=10, pady=3)  # Stack the rows and stretch horizontally
+        row_frame.pack_propagate(False)  # Keep the height fixed whatever the labels contain
+
+        # Label for the task title
+        task_label = ctk.CTkLabel(row_frame, text="", font=("Helvetica", 16, "bold"), anchor="w")
+        task_label.pack(fill="x", padx=10)  # Align the label to the left with padding
+
+        # Label for the task description below the title
+        description_label = ctk.CTkLabel(row_frame, text="", font=("Helvetica", 12), fg_color="transparent", anchor="w")
+        description_label.pack(fill="x", padx=20)  # Align the description to the left with more padding
+
+        # Clicking anywhere on the row shows the task in full
+        for widget in (row_frame, task_label, description_label):
+            widget.bind("<Button-1>", lambda event: show_task(index))
+        return row_frame, task_label, description_label
+
+    # Function to show the full title, due date and description of the task in a row
+    def show_task(index):
+        task = row_tasks[index]
+        if task is None:
+            return
+        task_id, title, description, due_date = task
+        details = (f"Due: {due_date}\n\n" if due_date else "") + description
+        messagebox.showinfo(title, details)  # The dialog wraps long descriptions instead of cutting them
+
+    # Function to fill the row widgets with the tasks currently in view
+    def render_rows():
+        nonlocal first_row
+        first_row = max(0, min(first_row, total_tasks - VISIBLE_ROWS))  # Keep the view inside the list
+        page = store.page(first_row, VISIBLE_ROWS)  # Load only the visible tasks
+        for index, (row_frame, task_label, description_label) in enumerate(row_pool):
+            row_tasks[index] = page[index] if index < len(page) else None  # Remember which task each row shows
+            if index < len(page):
+                task_id, task, description, due_date = page[index]
+                # Display the task title, with its due date when it has one
+                title = f"{first_row + index + 1}. {task}" + (f"  (due {due_date})" if due_date else "")
+                description = " ".join(description.split())  # Keep the description on one line
+                if len(description) > DESCRIPTION_CHARS:
+                    description = description[:DESCRIPTION_CHARS - 3] + "..."
+                task_label.configure(text=title)
+                description_label.configure(text=description)
+                row_frame.grid()  # Show the row again if it was hidden
+            else:
+                row_frame.grid_remove()  # Hide rows with no task to show
+        if total_tasks:
+            scrollbar.set(first_row / total_tasks, (first_row + len(page)) / total_tasks)  # Size the scrollbar thumb
+        else:
+            scrollbar.set(0, 1)
 
-            # Display the task description below the title
-            description_label = ctk.CTkLabel(task_frame, text=description, font=("Helvetica", 12), wraplength=600, fg_color="transparent")
-            description_label.pack(anchor="w", padx=20, pady=5)  # Align the description to the left with more padding
+    # Function to scroll the list, called by the scrollbar ("moveto" fraction or "scroll" steps)
+    def scroll_list(action, amount, unit=None):
+        nonlocal first_row
+        if action == "moveto":
+            first_row = int(float(amount) * total_tasks)
+        else:
+            first_row += int(amount) * (VISIBLE_ROWS if unit == "pages" else 1)
+        render_rows()
+
+    # Function to scroll the list with the mouse wheel while the pointer is over it
+    def on_mouse_wheel(event):
+        widget = root.winfo_containing(event.x_root, event.y_root)
+        if widget is None or not str(widget).startswith(str(list_frame)):
+            return  # Let other widgets, like the description box, scroll themselves
+        if str(widget).startswith(str(scrollbar)):
+            return  # The scrollbar binds the wheel itself; handling it here too would scroll twice
+        if event.num == 4 or event.delta > 0:  # Button 4 is wheel up on Linux
+            scroll_list("scroll", -1)
+        else:
+            scroll_list("scroll", 1)
 
     # Function to remove the last task in the list
     def remove_task():
-        try:
-            selected_task_index = len(tasks) - 1  # Get the index of the last task
-            tasks.pop(selected_task_index)  # Remove the last task from the list
-            update_task_list()  # Update the task list display
-            messagebox.showinfo("Task Removed", "Task removed successfully!")  # Show a success message
-        except IndexError:
+        nonlocal total_tasks
+        last_task = store.last()  # Get the most recently added task
+        if last_task is None:
             # Show a warning if there are no tasks to remove
             messagebox.showwarning("Warning", "Please select a task to remove!")
+            return
+        store.remove(last_task[0])  # Delete the task from the database
+        total_tasks -= 1
+        render_rows()  # Redraw the visible rows only
+        messagebox.showinfo("Task Removed", "Task removed successfully!")  # Show a success message
 
     # Function to exit the application
     def exit_app():
+        store.close()  # Close the task database
         root.destroy()  # Close the main application window
 
-    tasks = []  # Initialize an empty list to store tasks
+    store = TaskStore()  # Open the task database
+    total_tasks = store.count()  # Number of tasks, kept up to date as tasks are added and removed
+    first_row = 0  # Position in the list of the top visible row
 
     # Configure the main application window
     ctk.set_appearance_mode("dark")  # Set the appearance mode to dark
@@ -71,16 +199,33 @@ def todo_list():
     task_entry = ctk.CTkEntry(input_frame, placeholder_text="Task Name", width=300, height=40)  # Create an entry field for task name
     task_entry.grid(row=0, column=0, padx=10)  # Position the entry field in the grid
 
+    due_entry = ctk.CTkEntry(input_frame, placeholder_text="Due YYYY-MM-DD (optional)", width=200, height=40)  # Create an entry field for the due date
+    due_entry.grid(row=0, column=1, padx=10)  # Position the due date field next to the task name
+
     add_button = ctk.CTkButton(input_frame, text="Add Task", command=add_task, width=100)  # Create a button to add tasks
-    add_button.grid(row=0, column=1, padx=10)  # Position the button next to the entry field
+    add_button.grid(row=0, column=2, padx=10)  # Position the button next to the entry fields
 
     # Textbox for task description
     description_entry = ctk.CTkTextbox(root, height=100, width=700, corner_radius=10, font=("Helvetica", 12))  # Create a text box for task description
     description_entry.pack(pady=10)  # Add padding to the description box
 
-    # Scrollable frame for task list
-    task_list_frame = ctk.CTkScrollableFrame(root, width=750, height=300, fg_color="#1E293B", corner_radius=15)  # Create a scrollable frame for tasks
-    task_list_frame.pack(pady=20)  # Add padding to the task list frame
+    # Frame for the task list; it holds a fixed pool of rows that are reused as the list scrolls
+    list_frame = ctk.CTkFrame(root, width=770, height=VISIBLE_ROWS * ROW_HEIGHT, fg_color="#1E293B", corner_radius=15)  # Create a frame for tasks
+    list_frame.pack(pady=20)  # Add padding to the task list frame
+    list_frame.grid_propagate(False)  # Keep the list at its fixed size
+    list_frame.grid_columnconfigure(0, weight=1)  # Let the rows take the full width
+
+    scrollbar = ctk.CTkScrollbar(list_frame, command=scroll_list)  # Scrollbar that moves through the whole task list
+    scrollbar.grid(row=0, column=1, rowspan=VISIBLE_ROWS, sticky="ns", padx=5, pady=5)  # Place it along the right edge
+
+    row_tasks = [None] * VISIBLE_ROWS  # The task shown in each row, for showing it in full on click
+    row_pool = [create_row(index) for index in range(VISIBLE_ROWS)]  # The only row widgets ever created
+    render_rows()  # Show the first page of saved tasks
+
+    # Scroll the list with the mouse wheel (Windows/macOS send MouseWheel, Linux sends buttons 4 and 5)
+    root.bind_all("<MouseWheel>", on_mouse_wheel)
+    root.bind_all("<Button-4>", on_mouse_wheel)
+    root.bind_all("<Button-5>", on_mouse_wheel)
 
     # Buttons for additional actions
     button_frame = ctk.CTkFrame(root, fg_color="transparent")  # Create a transparent frame for buttons
@@ -92,6 +237,7 @@ def todo_list():
     exit_button = ctk.CTkButton(button_frame, text="Exit", command=exit_app, width=150, fg_color="#1F6AA5", hover_color="#3B82F6")  # Button to exit the application
     exit_button.grid(row=0, column=1, padx=10)  # Position the button next to the remove button
 
+    root.protocol("WM_DELETE_WINDOW", exit_app)  # Close the database when the window is closed too
     root.mainloop()  # Run the main application loop
 
 todo_list()  # Call the function to run the to-do list application
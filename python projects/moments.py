@@ -1,5 +1,14 @@
+import argparse
+import glob
+import json
+import os
+import random
+import threading
 import time
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from types import SimpleNamespace
 
 import cv2
 import mediapipe as mp
@@ -11,106 +20,553 @@ pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tessera
 
 # Initialize MediaPipe Hand Tracking
 mp_hands = mp.solutions.hands
-hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
 mp_draw = mp.solutions.drawing_utils
 
-# Create a black canvas
+# Create a black canvas, plus a mask of where it has ink and the bounding box of that ink.
+# Both are resized to the camera's real resolution on the first frame.
 canvas = np.zeros((480, 640, 3), dtype=np.uint8)
+ink_mask = np.zeros((480, 640), dtype=np.uint8)
+ink_box = None  # (x0, y0, x1, y1), or None while the canvas is blank
+STROKE_THICKNESS = 5
+SMOOTHING = 0.5  # Weight of the newest fingertip position in the smoothed stroke
 
 # Variables for tracking movements
-prev_x, prev_y = None, None
+prev_x, prev_y = None, None  # Last smoothed stroke point
 drawing = False
-draw_buffer = deque(maxlen=10)  # Buffer to smooth drawing
 clear_motion_buffer = deque(maxlen=20)  # Store hand positions for clearing
 erase_mode = False
 last_clear_time = time.time()
 break_point = False  # Allow writing with clear separation
 
-# Open Camera
-cap = cv2.VideoCapture(0)
+class GestureConfig:
+    """Gesture thresholds, relative to hand or frame size so they work at any camera resolution."""
+
+    def __init__(self, fist_distance=0.35, thumb_extension=1.2, wave_motion=0.08, clear_cooldown=1.5):
+        self.fist_distance = fist_distance  # Thumb-to-pinky tip distance, in hand lengths, that counts as a fist
+        self.thumb_extension = thumb_extension  # Thumb is out when its tip is this much farther from the pinky base than its joint
+        self.wave_motion = wave_motion  # Fingertip spread, as a fraction of frame width, that counts as a wave
+        self.clear_cooldown = clear_cooldown  # Seconds between two wave clears
+
+gesture_config = GestureConfig()
+FINGER_TIPS = np.array([8, 12, 16, 20])  # Index, Middle, Ring, Pinky Finger Tips
+# Landmark pairs measured in one vectorized call: thumb tip/pinky base, thumb joint/pinky base,
+# thumb tip/pinky tip and wrist/middle finger base (the hand length)
+DISTANCE_PAIRS = (np.array([4, 3, 4, 9]), np.array([17, 17, 20, 0]))
+
+# Character recognition runs on a background worker so the video never waits for tesseract
+ocr_executor = ThreadPoolExecutor(max_workers=1)
+pending_ocr = None  # Future of the recognition in progress
+recognized_text = ""
+recognized_at = 0.0
+RESULT_DISPLAY_SECONDS = 3
+TIMER_SAMPLES = 4096  # Durations kept per stage for the percentiles, however long the program runs
+
+class LatestSlot:
+    """Hands the newest item from one thread to others; an item nobody took yet is simply replaced."""
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._item = None
+        self._seq = 0
+        self._closed = False
+
+    def put(self, item):
+        with self._condition:
+            self._item = item
+            self._seq += 1
+            self._condition.notify_all()
+
+    def get(self, after_seq=0, timeout=None):
+        """Wait for an item newer than after_seq; returns (seq, item), or (seq, None) once closed."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._seq > after_seq or self._closed, timeout)
+            if self._seq > after_seq:
+                return self._seq, self._item
+            return self._seq, None
+
+    def latest(self):
+        with self._condition:
+            return self._seq, self._item
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+class StageTimer:
+    """Thread-safe per-stage timing: exact count and total, percentiles from a fixed-size random sample."""
+
+    def __init__(self, samples=TIMER_SAMPLES):
+        self._lock = threading.Lock()
+        self._samples = samples
+        self._stages = {}  # name -> [count, total seconds, sampled durations]
+        self._random = random.Random(0)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        with self._lock:
+            stage = self._stages.setdefault(name, [0, 0.0, []])
+            stage[0] += 1
+            stage[1] += seconds
+            # Reservoir sampling: every duration so far has the same chance of being in the sample
+            if len(stage[2]) < self._samples:
+                stage[2].append(seconds)
+            else:
+                slot = self._random.randrange(stage[0])
+                if slot < self._samples:
+                    stage[2][slot] = seconds
+
+    def summary(self):
+        with self._lock:
+            stages = {name: (count, total, np.array(sample) * 1000) for name, (count, total, sample) in self._stages.items()}
+        return {
+            name: {"count": count, "mean_ms": float(total * 1000 / count), "p50_ms": float(np.percentile(ms, 50)),
+                   "p95_ms": float(np.percentile(ms, 95)), "total_s": float(total)}
+            for name, (count, total, ms) in stages.items()
+        }
+
+timer = StageTimer()
+
+class ImageSequenceCapture:
+    """Reads a sorted list of image files through the same read()/isOpened()/release() calls as cv2.VideoCapture."""
+
+    def __init__(self, paths):
+        self._paths = deque(paths)
+
+    def isOpened(self):
+        return bool(self._paths)
+
+    def read(self):
+        if not self._paths:
+            return False, None
+        frame = cv2.imread(self._paths.popleft())
+        return frame is not None, frame
+
+    def release(self):
+        self._paths.clear()
+
+def open_source(source):
+    """Open a camera index, a video file, a directory of images or an image glob pattern."""
+    if source.isdigit():
+        return cv2.VideoCapture(int(source))
+    if os.path.isdir(source):
+        source = os.path.join(source, "*")
+    if any(char in source for char in "*?["):
+        image_types = (".png", ".jpg", ".jpeg", ".bmp")
+        return ImageSequenceCapture(sorted(path for path in glob.glob(source) if path.lower().endswith(image_types)))
+    return cv2.VideoCapture(source)
+
+class MediaPipeTracker:
+    """Live hand tracking; optionally records every result as JSON lines for later replay."""
+
+    def __init__(self, record_path=None):
+        self._hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+        self._record = open(record_path, "w", encoding="utf-8") if record_path else None
+
+    def process(self, frame, index):
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        result = self._hands.process(rgb_frame)
+        if self._record:
+            hands = [[[point.x, point.y, point.z] for point in hand.landmark] for hand in result.multi_hand_landmarks or []]
+            self._record.write(json.dumps({"frame": index, "hands": hands}) + "\n")
+        return result
+
+    def close(self):
+        self._hands.close()
+        if self._record:
+            self._record.close()
+
+class LandmarkReplay:
+    """Replays landmarks recorded by MediaPipeTracker instead of running the hand model."""
+
+    def __init__(self, path):
+        from mediapipe.framework.formats import landmark_pb2
+
+        self._frames = {}
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                record = json.loads(line)
+                self._frames[record["frame"]] = [
+                    landmark_pb2.NormalizedLandmarkList(
+                        landmark=[landmark_pb2.NormalizedLandmark(x=x, y=y, z=z) for x, y, z in hand])
+                    for hand in record["hands"]
+                ]
+
+    def process(self, frame, index):
+        return SimpleNamespace(multi_hand_landmarks=self._frames.get(index) or None)
+
+    def close(self):
+        pass
+
+def capture_worker(cap, frames, stop):
+    """Read and mirror camera frames as fast as the camera delivers them."""
+    index = 0
+    while not stop.is_set() and cap.isOpened():
+        with timer.stage("capture"):
+            ret, frame = cap.read()
+            if ret:
+                frame = cv2.flip(frame, 1)
+        if not ret:
+            break
+        frames.put((index, frame))
+        index += 1
+    frames.close()
+
+def inference_worker(tracker, frames, results, stop):
+    """Run hand tracking on the newest frame only, skipping frames that arrived while busy."""
+    seq = 0
+    while not stop.is_set():
+        seq, item = frames.get(seq)
+        if item is None:
+            break
+        index, frame = item
+        with timer.stage("hand inference"):
+            result = tracker.process(frame, index)
+        results.put(result)
+    tracker.close()
+    results.close()
+
+class TesserocrRecognizer:
+    """Keeps one tesseract engine loaded in-process (tesserocr), so each character costs only the recognition itself."""
+
+    name = "tesserocr"
+
+    def __init__(self):
+        import tesserocr
+        from PIL import Image
+
+        self._image = Image
+        self._api = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.SINGLE_CHAR)
+
+    def recognize(self, binary_image):
+        self._api.SetImage(self._image.fromarray(binary_image))
+        return self._api.GetUTF8Text().strip()
+
+    def close(self):
+        self._api.End()
+
+class SubprocessRecognizer:
+    """Fallback that starts the tesseract executable for every character."""
+
+    name = "tesseract"
+
+    def recognize(self, binary_image):
+        return pytesseract.image_to_string(binary_image, config='--psm 10').strip()  # Read single character
+
+    def close(self):
+        pass
+
+recognizer = None  # Created on the OCR worker thread, which is the only thread that uses it
+
+def get_recognizer():
+    """Return the recognition engine, loading the fastest available one on first use."""
+    global recognizer
+    if recognizer is None:
+        try:
+            recognizer = TesserocrRecognizer()
+        except (ImportError, RuntimeError) as e:
+            print(f"tesserocr not available ({e}), falling back to the tesseract executable")
+            recognizer = SubprocessRecognizer()
+    return recognizer
+
+def release_recognizer():
+    """Free the recognition engine (runs on the OCR worker thread)."""
+    global recognizer
+    if recognizer is not None:
+        recognizer.close()
+        recognizer = None
 
 def recognize_drawing(image):
     """Recognize numbers or letters drawn on the canvas."""
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    gray = cv2.GaussianBlur(gray, (5, 5), 0)  # Reduce noise
-    _, thresh = cv2.threshold(gray, 120, 255, cv2.THRESH_BINARY_INV)
-    text = pytesseract.image_to_string(thresh, config='--psm 10')  # Read single character
-    return text.strip()
-
-def count_fingers(hand_landmarks):
-    """Count the number of extended fingers."""
-    tips = [8, 12, 16, 20]  # Index, Middle, Ring, Pinky Finger Tips
-    count = 0
-    for tip in tips:
-        if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[tip - 2].y:
-            count += 1
-    return count
-
-while cap.isOpened():
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    frame = cv2.flip(frame, 1)
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(rgb_frame)
-
-    if result.multi_hand_landmarks:
-        for hand_landmarks in result.multi_hand_landmarks:
-            mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-            # Get index finger tip coordinates
-            index_finger = hand_landmarks.landmark[8]
-            x, y = int(index_finger.x * 640), int(index_finger.y * 480)
-            clear_motion_buffer.append((x, y))
-
-            # Writing Mode (Index Finger Down)
-            if index_finger.y < hand_landmarks.landmark[6].y and not break_point:
-                draw_buffer.append((x, y))
-                if len(draw_buffer) > 1:
-                    for i in range(len(draw_buffer) - 1):
-                        cv2.line(canvas, draw_buffer[i], draw_buffer[i + 1], (255, 255, 255), 5)
-                prev_x, prev_y = x, y
-                drawing = True
-            else:
-                draw_buffer.clear()
-                prev_x, prev_y = None, None  # Stop drawing
+    with timer.stage("ocr"):
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)  # Reduce noise
+        _, thresh = cv2.threshold(gray, 120, 255, cv2.THRESH_BINARY_INV)
+        return get_recognizer().recognize(thresh)
 
-            # Set breakpoint when hand moves away
-            if index_finger.y > hand_landmarks.landmark[6].y:
-                break_point = True  # Pause writing until finger is back
-            else:
-                break_point = False
-
-            # Count fingers
-            finger_count = count_fingers(hand_landmarks)
-
-            # Clear screen if full hand is open and waved
-            if finger_count == 5 and time.time() - last_clear_time > 1.5:
-                motion_variation = np.std(clear_motion_buffer, axis=0).sum()
-                if motion_variation > 50:  # Ensure actual movement before clearing
-                    canvas[:] = 0
-                    last_clear_time = time.time()
-                    print("Screen Cleared!")
-
-            # Detect fist gesture for recognition
-            thumb_tip = hand_landmarks.landmark[4]
-            pinky_tip = hand_landmarks.landmark[20]
-            if abs(thumb_tip.x - pinky_tip.x) < 0.05 and abs(thumb_tip.y - pinky_tip.y) < 0.05:
-                recognized_text = recognize_drawing(canvas)
-                print(f"Recognized: {recognized_text}")
-                canvas[:] = 0
-
-    # Merge frame and canvas
-    blended = cv2.addWeighted(frame, 0.7, canvas, 0.3, 0)
-    cv2.putText(blended, "Press 'C' to Clear", (20, 450), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-    cv2.imshow("Finger Drawing & Recognition", blended)
-
-    key = cv2.waitKey(1) & 0xFF
+def draw_segment(start, end):
+    """Ink one stroke segment and grow the inked region to cover it."""
+    global ink_box
+    cv2.line(canvas, start, end, (255, 255, 255), STROKE_THICKNESS)
+    cv2.line(ink_mask, start, end, 255, STROKE_THICKNESS)
+    pad = STROKE_THICKNESS
+    x0, x1 = min(start[0], end[0]) - pad, max(start[0], end[0]) + pad + 1
+    y0, y1 = min(start[1], end[1]) - pad, max(start[1], end[1]) + pad + 1
+    if ink_box is not None:
+        x0, y0, x1, y1 = min(x0, ink_box[0]), min(y0, ink_box[1]), max(x1, ink_box[2]), max(y1, ink_box[3])
+    height, width = ink_mask.shape
+    ink_box = (max(0, x0), max(0, y0), min(width, x1), min(height, y1))
+
+def clear_canvas():
+    """Erase all ink."""
+    global ink_box
+    if ink_box is not None:
+        x0, y0, x1, y1 = ink_box
+        canvas[y0:y1, x0:x1] = 0
+        ink_mask[y0:y1, x0:x1] = 0
+        ink_box = None
+
+def blend_ink(frame):
+    """Blend the canvas into the frame in place, touching only pixels that have ink."""
+    if ink_box is None:
+        return frame
+    x0, y0, x1, y1 = ink_box
+    region = frame[y0:y1, x0:x1]
+    mixed = cv2.addWeighted(region, 0.7, canvas[y0:y1, x0:x1], 0.3, 0)
+    np.copyto(region, mixed, where=ink_mask[y0:y1, x0:x1, None] > 0)
+    return frame
+
+def crop_to_ink(image, padding=20):
+    """Crop the canvas to the bounding box of the drawn strokes, or return None if it is blank."""
+    if ink_box is None:
+        return None
+    x0, y0, x1, y1 = ink_box
+    height, width = image.shape[:2]
+    return image[max(0, y0 - padding):min(height, y1 + padding), max(0, x0 - padding):min(width, x1 + padding)].copy()
+
+def submit_recognition(image):
+    """Queue the drawing for recognition unless one is already running; returns True if queued."""
+    global pending_ocr
+    if pending_ocr is not None:
+        return False
+    drawing_crop = crop_to_ink(image)
+    if drawing_crop is None:
+        return False
+    pending_ocr = ocr_executor.submit(recognize_drawing, drawing_crop)
+    return True
+
+def collect_recognition():
+    """Pick up a finished recognition result, if any."""
+    global pending_ocr, recognized_text, recognized_at
+    if pending_ocr is None or not pending_ocr.done():
+        return
+    try:
+        recognized_text = pending_ocr.result()
+    except Exception as e:  # A broken tesseract install must not stop the video
+        recognized_text = ""
+        print(f"Recognition failed: {e}")
+    else:
+        print(f"Recognized: {recognized_text}")
+    recognized_at = time.time()
+    pending_ocr = None
+
+def landmarks_to_array(hand_landmarks, width, height):
+    """Convert MediaPipe landmarks to a (21, 2) array of pixel coordinates for the real frame size."""
+    points = np.array([(landmark.x, landmark.y) for landmark in hand_landmarks.landmark], dtype=np.float32)
+    return points * np.array([width, height], dtype=np.float32)
+
+def evaluate_gestures(points, config=gesture_config):
+    """Evaluate the writing, finger-count and fist gestures of one hand with array operations."""
+    extended = points[FINGER_TIPS, 1] < points[FINGER_TIPS - 2, 1]  # Tip above its middle joint
+    thumb_tip_out, thumb_joint_out, thumb_to_pinky, hand_length = np.linalg.norm(
+        points[DISTANCE_PAIRS[0]] - points[DISTANCE_PAIRS[1]], axis=1)
+    thumb_extended = thumb_tip_out > thumb_joint_out * config.thumb_extension
+    return {
+        "tip": (int(points[8, 0]), int(points[8, 1])),
+        "writing": bool(extended[0]),
+        "finger_count": int(extended.sum()) + int(thumb_extended),
+        "fist": bool(thumb_to_pinky < config.fist_distance * max(hand_length, 1.0)),
+    }
+
+def is_waving(positions, width, config=gesture_config):
+    """True when recent fingertip positions are spread widely enough to count as a wave."""
+    return len(positions) > 1 and np.std(positions, axis=0).sum() > config.wave_motion * width
+
+def ensure_canvas(height, width):
+    """Resize the canvas and ink mask to the frame size (this clears them)."""
+    global canvas, ink_mask, ink_box
+    if canvas.shape[:2] != (height, width):
+        canvas = np.zeros((height, width, 3), dtype=np.uint8)
+        ink_mask = np.zeros((height, width), dtype=np.uint8)
+        ink_box = None
+
+def handle_hand(hand_landmarks):
+    """Apply the writing, clearing and recognition gestures of one tracked hand to the canvas."""
+    global prev_x, prev_y, drawing, break_point, last_clear_time
+
+    height, width = canvas.shape[:2]
+    gestures = evaluate_gestures(landmarks_to_array(hand_landmarks, width, height))
+
+    # Get index finger tip coordinates
+    x, y = gestures["tip"]
+    clear_motion_buffer.append((x, y))
+
+    # Writing Mode (Index Finger Down)
+    if gestures["writing"] and not break_point:
+        # Smooth the fingertip path and ink only the newest segment
+        if prev_x is None:
+            smoothed = (x, y)
+        else:
+            smoothed = (int(prev_x + SMOOTHING * (x - prev_x)), int(prev_y + SMOOTHING * (y - prev_y)))
+            draw_segment((prev_x, prev_y), smoothed)
+        prev_x, prev_y = smoothed
+        drawing = True
+    else:
+        prev_x, prev_y = None, None  # Stop drawing
+
+    # Set breakpoint when hand moves away
+    break_point = not gestures["writing"]  # Pause writing until finger is back
+
+    # Clear screen if full hand is open and waved
+    if gestures["finger_count"] == 5 and time.time() - last_clear_time > gesture_config.clear_cooldown:
+        if is_waving(clear_motion_buffer, width):  # Ensure actual movement before clearing
+            clear_canvas()
+            last_clear_time = time.time()
+            print("Screen Cleared!")
+
+    # Detect fist gesture for recognition
+    if gestures["fist"]:
+        if submit_recognition(canvas):
+            clear_canvas()
+
+def render(frame, result, draw_hands=True):
+    """Apply a tracking result (if new) and build the displayed image for one frame."""
+    height, width = frame.shape[:2]
+    ensure_canvas(height, width)
+    with timer.stage("drawing"):
+        if result is not None and result.multi_hand_landmarks:
+            for hand_landmarks in result.multi_hand_landmarks:
+                handle_hand(hand_landmarks)
+
+    with timer.stage("blending"):
+        # Merge frame and canvas where there is ink
+        blended = blend_ink(frame)
+        cv2.putText(blended, "Press 'C' to Clear", (20, height - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+
+        # Show the recognition status without waiting for it
+        collect_recognition()
+        if pending_ocr is not None:
+            cv2.putText(blended, "Recognizing...", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 0), 2)
+        elif recognized_text and time.time() - recognized_at < RESULT_DISPLAY_SECONDS:
+            cv2.putText(blended, f"Recognized: {recognized_text}", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+    return blended
+
+def show(blended):
+    """Display the image; returns False when the user asked to quit."""
+    with timer.stage("display"):
+        cv2.imshow("Finger Drawing & Recognition", blended)
+        key = cv2.waitKey(1) & 0xFF
     if key == ord('q'):
-        break
+        return False
     elif key == ord('c'):
-        canvas[:] = 0  # Clear screen manually
+        clear_canvas()  # Clear screen manually
+    return True
+
+def run_pipelined(cap, tracker, headless, max_frames):
+    """Live mode: capture and hand tracking on their own threads, drawing and display on this one."""
+    # Each stage only ever takes the newest frame, so a slow stage drops frames instead of lagging behind.
+    frames, results, stop = LatestSlot(), LatestSlot(), threading.Event()
+    workers = [
+        threading.Thread(target=capture_worker, args=(cap, frames, stop), daemon=True),
+        threading.Thread(target=inference_worker, args=(tracker, frames, results, stop), daemon=True),
+    ]
+    for worker in workers:
+        worker.start()
+
+    frame_seq = result_seq = shown = 0
+    result = None
+    while max_frames is None or shown < max_frames:
+        frame_seq, item = frames.get(frame_seq)
+        if item is None:
+            break
+        frame = item[1].copy()  # The tracking thread may still be reading the captured frame
+
+        # Gestures are applied once per new tracking result; the newest landmarks are drawn on every frame
+        seq, latest = results.latest()
+        new_result = None
+        if seq > result_seq:
+            result_seq, result = seq, latest
+            new_result = result
+        if not headless and result is not None and result.multi_hand_landmarks:
+            for hand_landmarks in result.multi_hand_landmarks:
+                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+        blended = render(frame, new_result)
+        shown += 1
+        if not headless and not show(blended):
+            break
+
+    stop.set()
+    for worker in workers:
+        worker.join(timeout=1)
+    return shown
+
+def run_sequential(cap, tracker, headless, max_frames):
+    """Benchmark and replay mode: every frame goes through every stage in order, so runs are repeatable."""
+    index = 0
+    while cap.isOpened() and (max_frames is None or index < max_frames):
+        with timer.stage("capture"):
+            ret, frame = cap.read()
+            if ret:
+                frame = cv2.flip(frame, 1)
+        if not ret:
+            break
+        with timer.stage("hand inference"):
+            result = tracker.process(frame, index)
+        if not headless and result.multi_hand_landmarks:
+            for hand_landmarks in result.multi_hand_landmarks:
+                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+        blended = render(frame, result)
+        index += 1
+        if not headless and not show(blended):
+            break
+    if pending_ocr is not None:
+        pending_ocr.result()  # Let the last recognition finish so it is part of the report
+        collect_recognition()
+    tracker.close()
+    return index
+
+def print_report(report):
+    print(f"\nFrames: {report['frames']}  Wall time: {report['seconds']:.2f} s  End-to-end FPS: {report['fps']:.1f}")
+    print(f"{'stage':<16}{'count':>7}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'total s':>10}")
+    for name, stats in report["stages"].items():
+        print(f"{name:<16}{stats['count']:>7}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}"
+              f"{stats['p95_ms']:>10.2f}{stats['total_s']:>10.2f}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Draw characters in the air with your finger and recognize them.")
+    parser.add_argument("--source", default="0", help="Camera index, video file, image directory or image glob (default: camera 0)")
+    parser.add_argument("--landmarks", help="Replay hand landmarks recorded with --record-landmarks instead of running MediaPipe")
+    parser.add_argument("--record-landmarks", help="Save MediaPipe hand landmarks of every processed frame to this JSONL file")
+    parser.add_argument("--headless", action="store_true", help="Do not open a window")
+    parser.add_argument("--benchmark", action="store_true", help="Process every frame in order and print per-stage timings")
+    parser.add_argument("--max-frames", type=int, help="Stop after this many frames")
+    parser.add_argument("--report", help="Write the timing report to this JSON file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Open Camera (or recording)
+    cap = open_source(args.source)
+    tracker = LandmarkReplay(args.landmarks) if args.landmarks else MediaPipeTracker(args.record_landmarks)
+    ocr_executor.submit(get_recognizer)  # Load the recognition engine before the first fist gesture
+
+    start = time.perf_counter()
+    # Files and image sequences are read as fast as the disk allows, so only a live camera gets the pipelined loop;
+    # a recording replayed through it would skip most frames and report capture speed as FPS.
+    run = run_pipelined if args.source.isdigit() and not args.benchmark else run_sequential
+    frames = run(cap, tracker, args.headless, args.max_frames)
+    elapsed = time.perf_counter() - start
+
+    ocr_executor.submit(release_recognizer)
+    ocr_executor.shutdown(wait=False)
+    cap.release()
+    if not args.headless:
+        cv2.destroyAllWindows()
+
+    report = {"frames": frames, "seconds": elapsed, "fps": frames / elapsed if elapsed else 0.0, "stages": timer.summary()}
+    if args.benchmark or args.report:
+        print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
 
-cap.release()
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    main()
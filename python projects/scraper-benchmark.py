@@ -0,0 +1,224 @@
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Description: Benchmarks web-scraper.py against a local fixture server serving synthetic pages.
+# Usage: python scraper-benchmark.py --pages 200 --page-kb 256 --density 8 --rows 100000 --json results.json
+# Every stage runs in a fresh process so its peak RSS is measured on its own.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+         "et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi").split()
+FIXTURE_TAGS = ["h1", "h2", "p", "a", "li", "span", "div"]
+
+# Function to load web-scraper.py as a module (its file name is not importable)
+def load_scraper():
+    spec = importlib.util.spec_from_file_location("web_scraper", os.path.join(HERE, "web-scraper.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# Function to build a synthetic page of roughly size_kb kilobytes with `density` tagged elements per KB
+def make_page(size_kb, density, seed=0):
+    rng = random.Random(seed)
+    words_per_element = max(1, int(1024 / density / 7))
+    parts = ["<!DOCTYPE html><html><head><title>Fixture</title><style>p { color: #333; }</style></head><body>"]
+    size = len(parts[0])
+    while size < size_kb * 1024:
+        tag = rng.choice(FIXTURE_TAGS)
+        text = " ".join(rng.choices(WORDS, k=words_per_element))
+        if rng.random() < 0.1:
+            # Lists with omitted </li> tags, as many catalogue pages have, exercise implied end tags
+            items = "".join(f"<li>{rng.choice(WORDS)} {rng.choice(WORDS)}" for _ in range(rng.randrange(2, 6)))
+            element = f'<div class="row"><ul>{items}</ul></div>\n'
+        elif rng.random() < 0.05:
+            # Inline scripts and styles are code, so no parser may count them as the element's text
+            element = (f'<div class="row"><{tag}>{text}<script>var n = {rng.randrange(100)};</script>'
+                       f'<style>.c{rng.randrange(10)} {{ margin: 0; }}</style> {rng.choice(WORDS)}</{tag}></div>\n')
+        else:
+            element = f'<div class="row"><{tag} class="c{rng.randrange(10)}">{text}</{tag}></div>\n'
+        parts.append(element)
+        size += len(element)
+    parts.append("<script>var fixture = true;</script></body></html>")
+    return "".join(parts).encode("utf-8")
+
+# Function to start a local HTTP server that serves the same fixture page under /page/<n>
+def start_fixture_server(page):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like a real server
+
+        def do_GET(self):
+            body = page if self.path.startswith("/page/") else b""
+            self.send_response(200 if body else 404)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+# Function to read this process's peak resident memory in bytes (None where unavailable)
+def peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def bench_crawl(base_url, pages, page_bytes, tags, concurrency, stream):
+    scraper = load_scraper()
+    session = scraper.CrawlScheduler(scraper.create_session(pool_maxsize=concurrency), rate=1e9, burst=1e9,
+                                     respect_robots=False)
+    urls = [f"{base_url}/page/{i}" for i in range(pages)]
+    failures = rows = 0
+    start = time.perf_counter()
+    for _, data, error in scraper.crawl(urls, tags, max_in_flight=concurrency, per_host_limit=concurrency,
+                                        session=session, stream=stream):
+        if error:
+            failures += 1
+        else:
+            rows += sum(len(texts) for texts in data.values())
+    elapsed = time.perf_counter() - start
+    return {
+        "stage": "crawl (stream)" if stream else "crawl", "seconds": elapsed, "pages_per_s": pages / elapsed,
+        "bytes_per_s": pages * page_bytes / elapsed, "rows": rows, "failures": failures, "peak_rss": peak_rss(),
+    }
+
+def bench_parse(page, tags, parser, repeats):
+    scraper = load_scraper()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        if parser == "stream":
+            chunks = (page[i:i + scraper.CHUNK_SIZE] for i in range(0, len(page), scraper.CHUNK_SIZE))
+            scraper.stream_extract(chunks, tags)
+        else:
+            scraper.extract_tags(page, tags, parser)
+    elapsed = time.perf_counter() - start
+    megabytes = len(page) * repeats / 1e6
+    return {"stage": f"parse {parser}", "seconds": elapsed, "s_per_mb": elapsed / megabytes, "peak_rss": peak_rss()}
+
+def bench_export(fmt, rows, directory):
+    scraper = load_scraper()
+    rng = random.Random(1)
+    filename = os.path.join(directory, f"bench.{fmt}")
+    page = {"p": [" ".join(rng.choices(WORDS, k=rng.randrange(3, 40))) for _ in range(rows)]}
+    start = time.perf_counter()
+    with scraper.open_writer(filename, fmt) as writer:
+        writer.write_page("http://fixture/page/0", page)
+    elapsed = time.perf_counter() - start
+    return {"stage": f"export {fmt}", "seconds": elapsed, "rows_per_s": rows / elapsed,
+            "file_bytes": os.path.getsize(filename), "peak_rss": peak_rss()}
+
+# Function to check that streaming extraction returns the same text as every full parse of the same page
+def check_stream(page, tags):
+    scraper = load_scraper()
+    # html.parser does not apply implied end tags, so it is no reference
+    references = [parser for parser in available_parsers() if parser in ("lxml", "selectolax")]
+    if not references:
+        return None
+    chunks = (page[i:i + scraper.CHUNK_SIZE] for i in range(0, len(page), scraper.CHUNK_SIZE))
+    streamed = scraper.stream_extract(chunks, tags)
+    mismatched = []
+    for reference in references:
+        expected = scraper.extract_tags(page, tags, reference)
+        mismatched.extend(f"{tag} ({reference})" for tag in tags if streamed[tag] != expected[tag])
+    return mismatched
+
+# Function to run a benchmark stage in its own process so peak RSS is per stage
+def run_isolated(func, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args).result()
+
+def available_parsers():
+    scraper = load_scraper()
+    parsers = ["html.parser", "stream"]
+    if scraper.lxml is not None:
+        parsers.insert(0, "lxml")
+    if scraper.SelectolaxParser is not None:
+        parsers.insert(0, "selectolax")
+    return parsers
+
+def available_formats():
+    optional = {"parquet": "pyarrow", "pdf": "reportlab"}  # Formats that need an extra package
+    return [fmt for fmt in ("csv", "jsonl", "parquet", "pdf")
+            if fmt not in optional or importlib.util.find_spec(optional[fmt]) is not None]
+
+def format_row(result):
+    cells = [f"{result['stage']:<22}", f"{result['seconds']:>8.3f} s"]
+    if "pages_per_s" in result:
+        cells.append(f"{result['pages_per_s']:>9.1f} pages/s  {result['bytes_per_s'] / 1e6:>8.2f} MB/s")
+    if "s_per_mb" in result:
+        cells.append(f"{result['s_per_mb'] * 1000:>9.1f} ms/MB")
+    if "rows_per_s" in result:
+        cells.append(f"{result['rows_per_s']:>9.0f} rows/s  {result['file_bytes'] / 1e6:>8.2f} MB file")
+    if result.get("peak_rss"):
+        cells.append(f"peak RSS {result['peak_rss'] / 1e6:.0f} MB")
+    return "  ".join(cells)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark web-scraper.py against a local fixture server.")
+    parser.add_argument("--pages", type=int, default=200, help="Pages to crawl")
+    parser.add_argument("--page-kb", type=int, default=256, help="Size of each fixture page in KB")
+    parser.add_argument("--density", type=float, default=8, help="Tagged elements per KB of HTML")
+    parser.add_argument("--tags", default="h1,p,a,li", help="Tags to extract")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests during the crawl")
+    parser.add_argument("--parse-repeats", type=int, default=5, help="Times each parser parses the page")
+    parser.add_argument("--rows", type=int, default=100_000, help="Rows written by each export format")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    tags = [tag.strip() for tag in args.tags.split(",") if tag.strip()]
+    page = make_page(args.page_kb, args.density)
+    server = start_fixture_server(page)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"Fixture page: {len(page) / 1024:.0f} KB, {args.density:g} elements/KB, served from {base_url}")
+
+    mismatched = check_stream(page, tags)
+    if mismatched:
+        print(f"Error: streaming extraction differs from a full parse for: {', '.join(mismatched)}", file=sys.stderr)
+        server.shutdown()
+        return 1
+
+    results = []
+    try:
+        for stream in (False, True):
+            results.append(run_isolated(bench_crawl, base_url, args.pages, len(page), tags, args.concurrency, stream))
+            print(format_row(results[-1]))
+        for parser in available_parsers():
+            results.append(run_isolated(bench_parse, page, tags, parser, args.parse_repeats))
+            print(format_row(results[-1]))
+        with tempfile.TemporaryDirectory() as directory:
+            for fmt in available_formats():
+                results.append(run_isolated(bench_export, fmt, args.rows, directory))
+                print(format_row(results[-1]))
+    finally:
+        server.shutdown()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"settings": vars(args), "results": results}, file, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
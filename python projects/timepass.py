@@ -1,18 +1,22 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import threading
 import cv2
 import numpy as np
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from deepface import DeepFace
-from scipy.signal import find_peaks
+from scipy.signal import butter, detrend, sosfiltfilt, welch
 
-# Global variables for heart rate estimation
-heart_rates = []
-blink_rate = 0
-stress_score = 0
-quiz_score = 0
-
-# Load the Haar Cascade Classifiers for face and eye detection
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
+# Haar Cascade Classifier for face detection (each FaceTracker loads its own, as a classifier is not thread-safe)
+FACE_CASCADE_PATH = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
 
 # Depression and Stress Questionnaire (Expanded)
 questions = [
@@ -26,181 +30,695 @@ questions = [
     "Do you feel a lack of motivation to do daily activities? (yes/no): "
 ]
 
-def capture_image_and_analyze():
-    global blink_rate, stress_score, quiz_score
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("Error: Could not access the camera")
-        return
-
-    print("The system will capture an image automatically in 5 seconds...")
-    
-    # Countdown for 5 seconds before capturing image
-    for i in range(5, 0, -1):
-        print(f"Capturing in {i} seconds...")
-        time.sleep(1)
-
-    blink_count = 0
-    start_time = time.time()
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("Failed to capture image")
-            break
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
-
-        blink_detected = False
-
-        for (x, y, w, h) in faces:
-            roi_gray = gray[y:y+h, x:x+w]
-            eyes = eye_cascade.detectMultiScale(roi_gray)
-            if len(eyes) == 0:
-                blink_detected = True
-
-        if blink_detected:
-            blink_count += 1
-
-        cv2.imshow("Press 's' to analyze", frame)
-
-        # Automatically capture after countdown (after 5 seconds)
-        if time.time() - start_time >= 5:  # Automatically after 5 seconds
-            cv2.imwrite("captured_face.jpg", frame)
-            print("Image captured as 'captured_face.jpg'")
-
-            # Analyze face emotions only if a face is detected
-            if len(faces) == 0:
-                print("No face detected in the captured image.")
-                continue
+COUNTDOWN_SECONDS = 5  # Preview time before measuring starts
+MEASURE_SECONDS = 15  # Length of the measurement (press 's' to stop earlier)
+EMOTION_BATCH = 5  # Face crops averaged into one emotion reading
+EMOTION_SAMPLE_SECONDS = 0.2  # Recorded videos send the emotion model one face crop per this much video time
+DETECT_EVERY = 10  # Full Haar detection every N frames; a tracker follows the face in between
+DETECT_SCALE = 0.5  # Detection and tracking run on a frame downscaled by this factor
+RPPG_WINDOW_SECONDS = 10  # Sliding window the heart rate is estimated over
+RPPG_MIN_SECONDS = 5  # Signal needed before the first estimate
+RPPG_BAND = (0.7, 4.0)  # Plausible pulse frequencies in Hz (42-240 BPM)
+RPPG_UPDATE_SECONDS = 1  # How often the live estimate is refreshed
+MAX_FPS = 60  # Sizes the sample ring buffers
+TIMING_SAMPLES = 4096  # Durations kept per timing for the percentiles, however long the session runs
+BLINK_WINDOW_SECONDS = 10  # Eye-openness history the blink baseline is taken from
+BLINK_UPDATE_SECONDS = 1  # How often new blinks are looked for
+BLINK_CLOSE_RATIO = 0.75  # Openness below this share of the baseline starts a closure
+BLINK_OPEN_RATIO = 0.9  # Openness back above this share of the baseline ends it
+BLINK_MAX_SECONDS = 0.8  # Longer closures are looking down or a lost face, not blinks
+EYE_ROI_SIZE = (64, 16)  # Eye band is resized to this (width, height) before measuring
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+BATCH_COLUMNS = [
+    "session", "video", "answers", "emotion", "stress_score", "blink_rate", "heart_rate", "heart_rate_confidence",
+    "quiz_score", "assessment", "frames", "duration_s", "face_detection_ms", "emotion_inference_ms", "session_s",
+    "face_detection_s", "blink_s", "heart_rate_s", "emotion_s", "questions_s", "total_s", "error",
+]
 
+# Stress score from facial emotion
+EMOTION_STRESS = {
+    "happy": 1, "neutral": 3, "sad": 5, "fear": 5,
+    "angry": 4, "disgust": 4, "surprise": 2
+}
+
+class SessionMetrics:
+    """Thread-safe hot-path counters, gauges and timings for one assessment session."""
+
+    def __init__(self, samples=TIMING_SAMPLES):
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._gauges = {}
+        self._samples = samples
+        self._durations = {}  # name -> [count, total seconds, sampled durations]
+        self._random = random.Random(0)
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def set(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def add(self, name, seconds):
+        with self._lock:
+            timing = self._durations.setdefault(name, [0, 0.0, []])
+            timing[0] += 1
+            timing[1] += seconds
+            # Reservoir sampling: every duration so far has the same chance of being in the sample
+            if len(timing[2]) < self._samples:
+                timing[2].append(seconds)
+            else:
+                slot = self._random.randrange(timing[0])
+                if slot < self._samples:
+                    timing[2][slot] = seconds
+
+    def summary(self):
+        with self._lock:
+            durations = {name: (count, total, np.array(sample) * 1000)
+                         for name, (count, total, sample) in self._durations.items()}
+        return {
+            name: {"count": count, "mean_ms": float(total * 1000 / count), "p50_ms": float(np.percentile(ms, 50)),
+                   "p95_ms": float(np.percentile(ms, 95)), "total_s": float(total)}
+            for name, (count, total, ms) in durations.items()
+        }
+
+    def to_dict(self):
+        with self._lock:
+            counters, gauges = dict(self._counters), dict(self._gauges)
+        return {"counters": counters, "gauges": gauges, "timings": self.summary()}
+
+def format_prometheus(sessions):
+    """Render {session name: SessionMetrics.to_dict()} in the Prometheus text exposition format."""
+    families = {}  # Metric name -> (type, sample lines), so each family is declared once across sessions
+    for session, metrics in sessions.items():
+        label = 'session="%s"' % str(session).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for name, value in metrics["counters"].items():
+            families.setdefault(f"timepass_{name}_total", ("counter", []))[1].append(f"timepass_{name}_total{{{label}}} {value}")
+        for name, value in metrics["gauges"].items():
+            families.setdefault(f"timepass_{name}", ("gauge", []))[1].append(f"timepass_{name}{{{label}}} {value}")
+        for name, stats in metrics["timings"].items():
+            family = f"timepass_{name}_seconds"
+            lines = families.setdefault(family, ("summary", []))[1]
+            lines.append(f'{family}{{{label},quantile="0.5"}} {stats["p50_ms"] / 1000}')
+            lines.append(f'{family}{{{label},quantile="0.95"}} {stats["p95_ms"] / 1000}')
+            lines.append(f"{family}_sum{{{label}}} {stats['total_s']}")
+            lines.append(f"{family}_count{{{label}}} {stats['count']}")
+    output = []
+    for family, (kind, lines) in families.items():
+        output.append(f"# TYPE {family} {kind}")
+        output.extend(lines)
+    return "\n".join(output) + "\n"
+
+def write_metrics(path, sessions):
+    """Save metrics for {session name: metrics dict}: Prometheus text for .prom files, JSON otherwise."""
+    with open(path, "w", encoding="utf-8") as file:
+        if path.endswith(".prom"):
+            file.write(format_prometheus(sessions))
+        else:
+            json.dump(sessions, file, indent=2)
+
+def create_tracker():
+    # MOSSE and KCF ship with opencv-contrib; without them we fall back to detecting every frame
+    for module, name in ((getattr(cv2, 'legacy', None), 'TrackerMOSSE_create'), (cv2, 'TrackerKCF_create')):
+        factory = getattr(module, name, None)
+        if factory is not None:
+            return factory()
+    return None
+
+class FaceTracker:
+    """Detects the face on a downscaled frame every few frames and tracks it in between."""
+
+    def __init__(self, detect_every=DETECT_EVERY, scale=DETECT_SCALE):
+        self.detect_every = detect_every
+        self.scale = scale
+        self.tracker = None
+        self.frames_since_detection = 0
+        self.detections = 0  # Full cascade runs, as opposed to tracked frames
+        self.cascade = cv2.CascadeClassifier(FACE_CASCADE_PATH)
+
+    def update(self, frame):
+        """Return the face box as [(x, y, w, h)] in full-frame coordinates, or [] when no face is found."""
+        small = cv2.resize(frame, None, fx=self.scale, fy=self.scale, interpolation=cv2.INTER_AREA)
+        if self.tracker is not None and self.frames_since_detection < self.detect_every:
+            ok, box = self.tracker.update(small)
+            box = self._clip(box, small.shape) if ok else None
+            if box is not None:
+                self.frames_since_detection += 1
+                return [self._to_full(box)]
+            # Tracking lost: fall through to a full detection
+
+        self.frames_since_detection = 0
+        self.detections += 1
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        min_size = max(1, int(30 * self.scale))
+        faces = self.cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(min_size, min_size))
+        if len(faces) == 0:
+            self.tracker = None
+            return []
+        box = tuple(int(v) for v in max(faces, key=lambda f: f[2] * f[3]))  # Track the largest face
+        self.tracker = create_tracker()
+        if self.tracker is not None:
+            self.tracker.init(small, box)
+        return [self._to_full(box)]
+
+    def _clip(self, box, shape):
+        x, y, w, h = (int(round(v)) for v in box)
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, shape[1]), min(y + h, shape[0])
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1 - x0, y1 - y0
+
+    def _to_full(self, box):
+        return tuple(int(v / self.scale) for v in box)
+
+class EmotionService:
+    """Loads the DeepFace emotion model once per process and keeps it warm between assessments."""
+
+    def __init__(self):
+        self._ready = threading.Event()
+        # Warm up in the background so the model loads while the camera preview counts down
+        threading.Thread(target=self._warm_up, daemon=True).start()
+
+    def _warm_up(self):
+        try:
+            # One pass over a blank crop downloads/builds the model before the first real face arrives
+            self._analyze_crop(np.zeros((48, 48, 3), dtype=np.uint8))
+        except Exception as e:
+            print(f"Error loading the emotion model: {e}")
+        finally:
+            self._ready.set()
+
+    def _analyze_crop(self, face_crop):
+        # The crop already comes from the Haar cascade, so DeepFace's own face detector is skipped
+        analysis = DeepFace.analyze(face_crop, actions=['emotion'], detector_backend='skip',
+                                    enforce_detection=False, silent=True)
+        return analysis[0]['emotion']
+
+    def analyze(self, face_crops, metrics=None):
+        """Average the emotion scores of several face crops; returns (dominant emotion, scores)."""
+        self._ready.wait()
+        totals = Counter()
+        for face_crop in face_crops:
+            started = time.perf_counter()
+            totals.update(self._analyze_crop(face_crop))
+            if metrics is not None:
+                metrics.add("emotion_inference", time.perf_counter() - started)
+        scores = {emotion: total / len(face_crops) for emotion, total in totals.items()}
+        return max(scores, key=scores.get), scores
+
+emotion_service = None
+emotion_service_lock = threading.Lock()
+
+def get_emotion_service():
+    global emotion_service
+    with emotion_service_lock:  # Sessions on several threads must still share a single model
+        if emotion_service is None:
+            emotion_service = EmotionService()
+    return emotion_service
+
+class FrameAnalyzer:
+    """Runs on its own thread and receives frames from the shared camera session through a queue."""
+
+    def __init__(self, metrics, name, latest_only=False, sample_seconds=None):
+        # Analyzers that need every frame get a deep queue; slow ones only ever see the newest frame
+        self.metrics = metrics
+        self.name = name
+        self.latest_only = latest_only
+        self.sample_seconds = sample_seconds  # Recorded sessions skip frames closer together than this
+        self._last_sampled = None
+        self.frames = queue.Queue(maxsize=1 if latest_only else 256)
+        self.error = None  # Last exception raised while analyzing, if any
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, timestamp, frame, faces, block=False):
+        if block:
+            # Recorded sessions wait for the analyzer so results are repeatable. Slow analyzers sample frames on the
+            # video's own clock, since waiting for them on every frame would replay slower than real time.
+            if self._last_sampled is not None and timestamp - self._last_sampled < (self.sample_seconds or 0):
+                return
+            self._last_sampled = timestamp
+            self.frames.put((timestamp, frame, faces))
+            return
+        if self.latest_only:
             try:
-                # Set enforce_detection=False to allow analysis even if face is not detected
-                analysis = DeepFace.analyze("captured_face.jpg", actions=['emotion'], enforce_detection=False)
-                emotion = analysis[0]['dominant_emotion']
-                print(f"Detected Emotion: {emotion}")
-
-                # Stress score from facial emotion
-                stress_score = {
-                    "happy": 1, "neutral": 3, "sad": 5, "fear": 5,
-                    "angry": 4, "disgust": 4, "surprise": 2
-                }.get(emotion, 3)
-
-                # Calculate blink rate per minute
-                elapsed_time = time.time() - start_time
-                blink_rate = (blink_count / elapsed_time) * 60
-                print(f"Blink Rate: {blink_rate:.2f} blinks/min")
-
-                # Estimate heart rate using the camera
-                capture_video_for_heart_rate()
-
-                # Automated stress level based on combined results
-                if heart_rates:  # Ensure heart_rates is not empty before accessing
-                    final_result = evaluate_stress(stress_score, blink_rate, heart_rates[-1], quiz_score)
-                    print("\n🔹 Final Mental Health Assessment:")
-                    print(final_result)
-
-                    # Display results on the captured image
-                    cv2.putText(frame, f"Emotion: {emotion}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                    cv2.putText(frame, f"Heart Rate: {heart_rates[-1]:.2f} BPM", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
-                    cv2.putText(frame, final_result, (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                    cv2.imshow("Result", frame)
-
-                    # Save the image with results
-                    cv2.imwrite("mood_assessment.jpg", frame)
-                    print("Results saved as 'mood_assessment.jpg'")
-
-                    cv2.waitKey(5000)
-                    break
-                else:
-                    print("Heart rate data is missing, unable to evaluate final assessment.")
-                    break
-
-            except Exception as e:
-                print(f"Error in face analysis: {e}")
+                self.frames.get_nowait()  # Replace a frame that was not analyzed yet
+            except queue.Empty:
+                pass
+        try:
+            self.frames.put_nowait((timestamp, frame, faces))
+        except queue.Full:
+            self.metrics.count(f"{self.name}_dropped_frames")  # Never stall the camera loop
+
+    def finish(self):
+        self.frames.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self.frames.get()
+            if item is None:
                 break
-
-        elif cv2.waitKey(1) & 0xFF == ord('q'):  
-            cap.release()
-            cv2.destroyAllWindows()
+            started = time.perf_counter()
+            try:
+                self.process(*item)
+            except Exception as e:
+                self._fail(e)  # Keep draining the queue so submit() and finish() always return
+            self.metrics.add(self.name, time.perf_counter() - started)
+        try:
+            self.flush()
+        except Exception as e:
+            self._fail(e)
+
+    def _fail(self, error):
+        if self.error is None:
+            print(f"Error in {self.name} analysis: {error}")
+        self.error = error
+        self.metrics.count(f"{self.name}_errors")
+
+    def process(self, timestamp, frame, faces):
+        raise NotImplementedError
+
+    def flush(self):
+        pass  # Called once after the last frame
+
+class SampleRing:
+    """Fixed-size ring buffer of timestamped samples; the oldest sample is overwritten once it is full."""
+
+    def __init__(self, window_seconds, capacity=None):
+        self.window_seconds = window_seconds
+        capacity = capacity or int(window_seconds * MAX_FPS)
+        self.times = np.zeros(capacity)
+        self.values = np.zeros(capacity)
+        self.count = 0
+        self.head = 0
+
+    def add(self, timestamp, value):
+        self.times[self.head] = timestamp
+        self.values[self.head] = value
+        self.head = (self.head + 1) % len(self.times)
+        self.count = min(self.count + 1, len(self.times))
+
+    def window(self):
+        """Samples from the last window_seconds, oldest first."""
+        order = (self.head - self.count + np.arange(self.count)) % len(self.times)
+        times, values = self.times[order], self.values[order]
+        keep = times >= times[-1] - self.window_seconds if self.count else slice(None)
+        return times[keep], values[keep]
+
+class RPPGEstimator(SampleRing):
+    """Streaming heart-rate estimate from timestamped green-channel samples of the face (remote PPG)."""
+
+    def __init__(self, window_seconds=RPPG_WINDOW_SECONDS, capacity=None):
+        super().__init__(window_seconds, capacity)
+
+    def stats(self):
+        """Size, span and sample rate of the current window, for the session metrics."""
+        times, _ = self.window()
+        span = float(times[-1] - times[0]) if len(times) > 1 else 0.0
+        return {"rppg_window_samples": len(times), "rppg_window_seconds": span,
+                "rppg_sample_rate_hz": (len(times) - 1) / span if span > 0 else 0.0}
+
+    def estimate(self):
+        """Return (bpm, confidence) for the current window, or None until there is enough signal."""
+        times, values = self.window()
+        if len(times) < 2 or times[-1] - times[0] < RPPG_MIN_SECONDS:
+            return None
+        fs = (len(times) - 1) / (times[-1] - times[0])  # Measured frame rate, not an assumed one
+        low, high = RPPG_BAND[0], min(RPPG_BAND[1], 0.45 * fs)
+        if high <= low:
+            return None
+
+        # Frames do not arrive evenly, so resample onto a uniform grid before filtering
+        grid = np.linspace(times[0], times[-1], len(times))
+        signal = detrend(np.interp(grid, times, values))
+        sos = butter(3, [low, high], btype='bandpass', fs=fs, output='sos')
+        padlen = 3 * (2 * len(sos) + 1)  # Edge padding sosfiltfilt needs; sparse face samples may not cover it
+        if len(signal) <= padlen:
+            return None
+        filtered = sosfiltfilt(sos, signal, padlen=padlen)
+
+        freqs, power = welch(filtered, fs=fs, nperseg=min(len(filtered), 256), nfft=4096)
+        band = (freqs >= low) & (freqs <= high)
+        freqs, power = freqs[band], power[band]
+        if power.sum() <= 0:
+            return None
+        peak = np.argmax(power)
+        # Confidence: share of the band's power that sits around the chosen peak
+        near_peak = np.abs(freqs - freqs[peak]) <= 0.15
+        confidence = float(power[near_peak].sum() / power.sum())
+        return float(freqs[peak] * 60), confidence
+
+def eye_openness(frame, face):
+    """Cheap eye-openness metric: vertical contrast of the eye band, which collapses when the lids close."""
+    x, y, w, h = face
+    band = frame[y + h//5:y + h//2, x + w//10:x + w*9//10]  # Both eyes, without brows or nose
+    if band.size == 0:
+        return None
+    gray = cv2.cvtColor(cv2.resize(band, EYE_ROI_SIZE, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY).astype(np.float32)
+    # Dividing by brightness keeps the value comparable when the lighting changes
+    return float(np.abs(np.diff(gray, axis=0)).mean() / (gray.mean() + 1))
+
+def hysteresis(low, high):
+    """Vectorized hysteresis: True from every `low` sample until the next `high` one, False before the first `low`."""
+    decided = low | high
+    # Forward-fill the index of the last decisive sample, then read the decision made there
+    last = np.where(decided, np.arange(len(low)), -1)
+    np.maximum.accumulate(last, out=last)
+    return (last >= 0) & low[np.maximum(last, 0)]
+
+class BlinkDetector(SampleRing):
+    """Counts blinks from per-frame eye-openness values, measured against the real frame timestamps."""
+
+    def __init__(self, window_seconds=BLINK_WINDOW_SECONDS, capacity=None):
+        super().__init__(window_seconds, capacity)
+        self.blinks = 0
+        self.first_time = None
+        self.last_time = None
+        self._last_onset = -np.inf
+        self._last_update = -np.inf
+
+    def add(self, timestamp, value):
+        super().add(timestamp, value)
+        if self.first_time is None:
+            self.first_time = timestamp
+        self.last_time = timestamp
+        if timestamp - self._last_update >= BLINK_UPDATE_SECONDS:
+            self._last_update = timestamp
+            self.update()
+
+    def update(self):
+        """Find finished closures in the window and count the ones not counted yet."""
+        times, values = self.window()
+        if len(values) < 3:
             return
-
-    cap.release()
-    cv2.destroyAllWindows()
-
-def capture_video_for_heart_rate():
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
-        print("Error: Could not access the camera")
-        return
-
-    heart_rate_signal = []
-    start_time = time.time()
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("Failed to capture image")
-            break
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
-
+        baseline = np.median(values)  # Eyes are open most of the time
+        closed = hysteresis(values < baseline * BLINK_CLOSE_RATIO, values > baseline * BLINK_OPEN_RATIO)
+
+        edges = np.diff(np.concatenate(([0], closed.astype(np.int8), [0])))
+        onsets, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        # A closure still running at the end of the window is counted next time; one already running at its
+        # start began before the window and was handled by an earlier pass
+        finished = (ends < len(values)) & (onsets > 0)
+        onsets, ends = onsets[finished], ends[finished]
+        durations = times[ends] - times[onsets]
+        new = (times[onsets] > self._last_onset) & (durations <= BLINK_MAX_SECONDS)
+        self.blinks += int(new.sum())
+        if len(onsets):
+            self._last_onset = max(self._last_onset, times[onsets[-1]])
+
+    def rate(self):
+        """Blinks per minute over the time the eyes were actually observed."""
+        if self.first_time is None or self.last_time <= self.first_time:
+            return 0.0
+        return self.blinks / (self.last_time - self.first_time) * 60
+
+class BlinkAnalyzer(FrameAnalyzer):
+    def __init__(self, metrics):
+        super().__init__(metrics, "blink")
+        self.detector = BlinkDetector()
+
+    def process(self, timestamp, frame, faces):
+        if len(faces) > 0:
+            openness = eye_openness(frame, faces[0])
+            if openness is not None:
+                self.detector.add(timestamp, openness)
+
+    def flush(self):
+        self.detector.update()
+        self.metrics.set("blinks", self.detector.blinks)
+
+class HeartRateAnalyzer(FrameAnalyzer):
+    def __init__(self, metrics):
+        super().__init__(metrics, "heart_rate")
+        self.estimator = RPPGEstimator()
+        self.bpm = None  # Live estimate, refreshed while capturing
+        self.confidence = 0.0
+        self._last_update = 0.0
+
+    def process(self, timestamp, frame, faces):
         if len(faces) > 0:
             x, y, w, h = faces[0]
-            face_region = frame[y:y+h, x:x+w]  # Extract the face region
-
-            # Calculate the average color in the face region
-            avg_color = np.mean(face_region, axis=(0, 1))  # Get average RGB values
-            avg_color_intensity = np.mean(avg_color)  # Get intensity (brightness)
-
-            # Append the intensity to the heart rate signal
-            heart_rate_signal.append(avg_color_intensity)
-
-            # Show the frame with a rectangle around the face
-            cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 0), 2)
-
-        cv2.imshow("Heart Rate Detection", frame)
-
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('s'):  
-            print("Capturing video for heart rate estimation...")
-            break
-        elif key == ord('q'):  
-            cap.release()
-            cv2.destroyAllWindows()
+            # Forehead and cheeks: the middle of the face box, away from hair and background
+            skin = frame[y + h//8:y + h*5//8, x + w//4:x + w*3//4]
+            if skin.size == 0:
+                return
+            self.estimator.add(timestamp, skin[:, :, 1].mean())  # Green carries the strongest pulse signal
+
+            if timestamp - self._last_update >= RPPG_UPDATE_SECONDS:
+                self._last_update = timestamp
+                started = time.perf_counter()
+                result = self.estimator.estimate()
+                self.metrics.add("rppg_estimate", time.perf_counter() - started)
+                for name, value in self.estimator.stats().items():
+                    self.metrics.set(name, value)
+                if result is not None:
+                    self.bpm, self.confidence = result
+                    self.metrics.set("rppg_bpm", self.bpm)
+                    self.metrics.set("rppg_confidence", self.confidence)
+
+class EmotionAnalyzer(FrameAnalyzer):
+    def __init__(self, metrics, service):
+        super().__init__(metrics, "emotion", latest_only=True, sample_seconds=EMOTION_SAMPLE_SECONDS)
+        self.service = service
+        self.face_crops = []
+        self.readings = []  # Averaged emotion scores, one per batch of crops
+
+    def process(self, timestamp, frame, faces):
+        if len(faces) == 0:
             return
+        x, y, w, h = faces[0]
+        self.face_crops.append(frame[y:y+h, x:x+w].copy())
+        if len(self.face_crops) >= EMOTION_BATCH:
+            self.flush()
 
-    cap.release()
-    cv2.destroyAllWindows()
+    def flush(self):
+        if not self.face_crops:
+            return
+        try:
+            self.readings.append(self.service.analyze(self.face_crops, self.metrics)[1])
+        except Exception as e:
+            print(f"Error in face analysis: {e}")
+        self.face_crops = []
+
+    def dominant_emotion(self):
+        if not self.readings:
+            return None
+        totals = Counter()
+        for scores in self.readings:
+            totals.update(scores)
+        return max(totals, key=totals.get)
+
+class AssessmentSession:
+    """State and metrics of one assessment run; sessions share only the emotion model, so several can run in one process."""
+
+    def __init__(self, name="live"):
+        self.name = name
+        self.metrics = SessionMetrics()
+        self.emotion = None
+        self.stress_score = 0
+        self.blink_rate = 0
+        self.heart_rates = []
+        self.heart_rate_confidence = None
+        self.quiz_score = 0
+        self.frames = 0
+        self.duration = 0.0
+        self.errors = {}  # Analyzer name -> last error message
+
+    @property
+    def heart_rate(self):
+        return self.heart_rates[-1] if self.heart_rates else None
+
+    def measure(self, source=0, show=True, countdown_seconds=COUNTDOWN_SECONDS, measure_seconds=MEASURE_SECONDS):
+        """Measure from a camera index or a recorded video; returns (completed, last frame).
+
+        Recorded videos are read to the end without a countdown and use the video's own timestamps. No frames are dropped,
+        except that emotion crops are sampled every EMOTION_SAMPLE_SECONDS of video.
+        """
+        live = isinstance(source, int)
+        service = get_emotion_service()  # Starts warming the model while the camera opens
+        cap = cv2.VideoCapture(source)
+        if not cap.isOpened():
+            print("Error: Could not access the camera" if live else f"Error: Could not open {source}")
+            return False, None
+        if not live:
+            countdown_seconds, measure_seconds = 0, None
+
+        if show:
+            print(f"Measurement starts in {countdown_seconds} seconds. Look at the camera (press 's' to finish early, 'q' to quit)...")
+        metrics = self.metrics
+        analyzers = blink, heart, emotion = BlinkAnalyzer(metrics), HeartRateAnalyzer(metrics), EmotionAnalyzer(metrics, service)
+        face_tracker = FaceTracker()
+        session_started = time.perf_counter()
+        first_time = start_time = now = None
+        frame = None
+
+        while True:
+            ret, next_frame = cap.read()
+            if not ret:
+                if live:
+                    print("Failed to capture image")
+                break
+            frame = next_frame
+            now = time.time() if live else cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+            if first_time is None:
+                first_time = now
+
+            if start_time is None:
+                # Countdown: keep showing the live preview instead of sleeping
+                remaining = countdown_seconds - (now - first_time)
+                if remaining <= 0:
+                    start_time = now
+                    for analyzer in analyzers:
+                        analyzer.start()
+                    if show:
+                        print("Measuring...")
+                elif show:
+                    preview = frame.copy()
+                    cv2.putText(preview, f"Starting in {int(remaining) + 1}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 255), 2)
+                    cv2.imshow("Mood Assessment", preview)
+
+            if start_time is not None:
+                self.frames += 1
+                metrics.count("frames_processed")
+                started = time.perf_counter()
+                faces = face_tracker.update(frame)
+                metrics.add("face_detection", time.perf_counter() - started)
+                for analyzer in analyzers:
+                    analyzer.submit(now, frame, faces, block=not live)
+
+                if show:
+                    preview = frame.copy()
+                    for (x, y, w, h) in faces:
+                        cv2.rectangle(preview, (x, y), (x+w, y+h), (0, 255, 0), 2)
+                    status = f"Measuring... {measure_seconds - (now - start_time):.0f}s" if measure_seconds else "Measuring..."
+                    cv2.putText(preview, status, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                    if heart.bpm is not None:
+                        cv2.putText(preview, f"Heart Rate: {heart.bpm:.0f} BPM ({heart.confidence:.0%})", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+                    cv2.imshow("Mood Assessment", preview)
+                if measure_seconds is not None and now - start_time >= measure_seconds:
+                    break
 
-    # After video capture, process the heart rate signal
-    calculate_heart_rate(heart_rate_signal, start_time)
+            if show:
+                key = cv2.waitKey(1) & 0xFF
+                if key == ord('s') and start_time is not None:
+                    break
+                elif key == ord('q'):
+                    start_time = None
+                    break
 
-def calculate_heart_rate(heart_rate_signal, start_time):
-    if len(heart_rate_signal) < 2:
-        print("Not enough data to estimate heart rate.")
+        cap.release()
+        metrics.count("full_detections", face_tracker.detections)
+        if start_time is None:
+            for analyzer in analyzers:
+                if analyzer._thread.is_alive():
+                    analyzer.finish()
+            return False, frame
+        for analyzer in analyzers:
+            analyzer.finish()  # Let every analyzer work through the frames it still has queued
+        metrics.add("session", time.perf_counter() - session_started)
+        self.errors = {analyzer.name: str(analyzer.error) for analyzer in analyzers if analyzer.error is not None}
+
+        self.duration = now - start_time
+        self.emotion = emotion.dominant_emotion()
+        if self.emotion is not None:
+            self.stress_score = EMOTION_STRESS.get(self.emotion, 3)
+        self.blink_rate = blink.detector.rate()  # Blinks per minute
+        try:
+            heart_rate = heart.estimator.estimate()
+        except Exception as e:  # A bad final window must not take the whole session down
+            heart_rate = None
+            self.errors[heart.name] = str(e)
+            metrics.count(f"{heart.name}_errors")
+        if heart_rate is not None:
+            self.heart_rates.append(heart_rate[0])
+            self.heart_rate_confidence = heart_rate[1]
+        return True, frame
+
+    def ask_questions(self, answers=None):
+        started = time.perf_counter()
+        self.quiz_score = ask_questions(answers)
+        self.metrics.add("questions", time.perf_counter() - started)
+        return self.quiz_score
+
+    def evaluate(self):
+        return evaluate_stress(self.stress_score, self.blink_rate, self.heart_rate, self.quiz_score)
+
+    def to_row(self):
+        """Measurements and per-stage timings as one batch result row."""
+        timings = self.metrics.summary()
+        row = {
+            "session": self.name, "emotion": self.emotion, "stress_score": self.stress_score if self.emotion else None,
+            "blink_rate": self.blink_rate, "heart_rate": self.heart_rate, "heart_rate_confidence": self.heart_rate_confidence,
+            "quiz_score": self.quiz_score, "frames": self.frames, "duration_s": self.duration,
+        }
+        for stage, column in (("face_detection", "face_detection_ms"), ("emotion_inference", "emotion_inference_ms")):
+            if stage in timings:
+                row[column] = timings[stage]["mean_ms"]
+        for stage in ("session", "face_detection", "blink", "heart_rate", "emotion", "questions"):
+            if stage in timings:
+                row[f"{stage}_s"] = timings[stage]["total_s"]
+        return row
+
+def capture_image_and_analyze(session):
+    """Run the live camera session and show the combined result."""
+    completed, frame = session.measure(0)
+    if not completed:
+        cv2.destroyAllWindows()
+        return
+    if session.emotion is None:
+        print("No face detected during the measurement.")
+        cv2.destroyAllWindows()
         return
+    print(f"Detected Emotion: {session.emotion}")
+    print(f"Blink Rate: {session.blink_rate:.2f} blinks/min")
 
-    heart_rate_signal = np.array(heart_rate_signal) - np.mean(heart_rate_signal)
-    peaks, _ = find_peaks(heart_rate_signal, distance=30)  # Find peaks (each corresponds to a heartbeat)
+    if session.heart_rate is not None:
+        print(f"Estimated Heart Rate: {session.heart_rate:.2f} BPM (confidence {session.heart_rate_confidence:.0%})")
+    else:
+        print("Not enough data to estimate heart rate.")
 
-    num_peaks = len(peaks)
-    elapsed_time = time.time() - start_time  # Total time in seconds
-    heart_rate = (num_peaks / elapsed_time) * 60  # Convert to BPM (beats per minute)
+    # Automated stress level based on combined results
+    if session.heart_rates:  # Ensure heart_rates is not empty before accessing
+        final_result = session.evaluate()
+        print("\n🔹 Final Mental Health Assessment:")
+        print(final_result)
+
+        # Display results on the last frame
+        cv2.putText(frame, f"Emotion: {session.emotion}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+        cv2.putText(frame, f"Heart Rate: {session.heart_rate:.2f} BPM", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+        cv2.putText(frame, final_result, (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        cv2.imshow("Result", frame)
+
+        # Save the image with results
+        cv2.imwrite("mood_assessment.jpg", frame)
+        print("Results saved as 'mood_assessment.jpg'")
+        cv2.waitKey(5000)
+    else:
+        print("Heart rate data is missing, unable to evaluate final assessment.")
+    cv2.destroyAllWindows()
 
-    print(f"Estimated Heart Rate: {heart_rate:.2f} BPM")
-    heart_rates.append(heart_rate)
+def load_answers(path):
+    """Read recorded questionnaire answers: a JSON list, or one yes/no per line."""
+    with open(path, encoding="utf-8") as file:
+        if path.lower().endswith(".json"):
+            return json.load(file)
+        return [line.strip() for line in file if line.strip()]
 
-def ask_questions():
-    global quiz_score
+def ask_questions(answers=None):
+    """Score the questionnaire from the keyboard, or from recorded answers when they are given."""
     score = 0
-    for question in questions:
-        answer = input(question).strip().lower()
+    for index, question in enumerate(questions):
+        if answers is None:
+            answer = input(question).strip().lower()
+        else:
+            answer = str(answers[index]).strip().lower() if index < len(answers) else ""  # Missing counts as "no"
         if answer == "yes":
             score += 1
-    quiz_score = score
     return score
 
 def evaluate_stress(face_score, blink_rate, heart_rate, quiz_score):
@@ -218,17 +736,116 @@ def evaluate_stress(face_score, blink_rate, heart_rate, quiz_score):
     else:
         return "🚨 High Stress/Depression Detected: Seek professional help or therapy."
 
-# Run the enhanced system
-capture_image_and_analyze()
-
-# After image is captured, ask the questions
-print("Now, let's ask a few questions to assess your mental health.")
-quiz_score = ask_questions()
-
-# The final evaluation based on facial expression, blink rate, heart rate, and quiz score
-if heart_rates:  # Ensure heart_rates is not empty before accessing
-    final_assessment = evaluate_stress(face_score=stress_score, blink_rate=blink_rate, heart_rate=heart_rates[-1], quiz_score=quiz_score)
-    print(f"\n🔹 Final Mental Health Assessment based on questionnaire:")
-    print(final_assessment)
-else:
-    print("Heart rate data is missing, unable to perform final assessment.")
+def assess_recording(video_path, answers_path=None):
+    """Run the whole assessment headless on a recorded session and return one result row."""
+    started = time.perf_counter()
+    session = AssessmentSession(os.path.splitext(os.path.basename(video_path))[0])
+    row = {"session": session.name, "video": video_path, "answers": answers_path or ""}
+    try:
+        completed, _ = session.measure(video_path, show=False)
+        if not completed:
+            raise ValueError("no frames could be read")
+        session.ask_questions(load_answers(answers_path) if answers_path else [])
+        row.update(session.to_row())
+
+        if session.errors:
+            row["error"] = "; ".join(f"{name} analysis failed: {error}" for name, error in session.errors.items())
+        elif session.emotion is None:
+            row["error"] = "no face detected"
+        elif session.heart_rate is None:
+            row["error"] = "not enough data to estimate heart rate"
+        else:
+            row["assessment"] = session.evaluate()
+    except Exception as e:
+        row["error"] = str(e)
+    row["total_s"] = time.perf_counter() - started
+    row["metrics"] = session.metrics.to_dict()  # Not a CSV column; collected for --metrics
+    return row
+
+def find_sessions(directory):
+    """List (video, answers) pairs; answers are <video name>.txt or <video name>.json next to the video."""
+    sessions = []
+    for name in sorted(os.listdir(directory)):
+        stem, extension = os.path.splitext(name)
+        if extension.lower() not in VIDEO_EXTENSIONS:
+            continue
+        candidates = [os.path.join(directory, stem + suffix) for suffix in (".txt", ".json")]
+        answers = next((path for path in candidates if os.path.exists(path)), None)
+        sessions.append((os.path.join(directory, name), answers))
+    return sessions
+
+def run_batch(directory, out_path, workers, metrics_path=None):
+    """Assess every recorded session in directory across a process pool, writing one CSV row per session."""
+    sessions = find_sessions(directory)
+    if not sessions:
+        print(f"No recorded sessions found in {directory}")
+        return 1
+
+    failures = 0
+    metrics = {}
+    # Spawned workers each import this module once and keep their emotion model warm for every session they get
+    with open(out_path, "w", newline="", encoding="utf-8") as file, \
+            ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        writer = csv.DictWriter(file, fieldnames=BATCH_COLUMNS, extrasaction="ignore")
+        writer.writeheader()
+        futures = [pool.submit(assess_recording, video, answers) for video, answers in sessions]
+        for future in as_completed(futures):
+            row = future.result()
+            writer.writerow(row)
+            file.flush()
+            failures += bool(row.get("error"))
+            metrics[row["session"]] = row["metrics"]
+            print(f"{row['session']}: {row.get('error') or row['assessment']} ({row['total_s']:.1f}s)")
+    print(f"Assessed {len(sessions)} sessions ({failures} failed); results saved to {out_path}")
+    if metrics_path:
+        write_metrics(metrics_path, metrics)
+    return 1 if failures else 0
+
+def run_interactive(metrics_path=None):
+    session = AssessmentSession()
+
+    # Run the enhanced system
+    capture_image_and_analyze(session)
+
+    # After image is captured, ask the questions
+    print("Now, let's ask a few questions to assess your mental health.")
+    session.ask_questions()
+
+    # The final evaluation based on facial expression, blink rate, heart rate, and quiz score
+    if session.heart_rates:  # Ensure heart_rates is not empty before accessing
+        final_assessment = session.evaluate()
+        print(f"\n🔹 Final Mental Health Assessment based on questionnaire:")
+        print(final_assessment)
+    else:
+        print("Heart rate data is missing, unable to perform final assessment.")
+    if metrics_path:
+        write_metrics(metrics_path, {session.name: session.metrics.to_dict()})
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mood and stress assessment from the camera, or headless over recorded sessions.")
+    parser.add_argument("--video", help="Assess a recorded video instead of the live camera (no windows)")
+    parser.add_argument("--answers", help="Recorded questionnaire answers for --video: one yes/no per line, or a JSON list")
+    parser.add_argument("--batch", metavar="DIR", help="Assess every video in DIR, with answers from <video name>.txt/.json")
+    parser.add_argument("--out", default="assessments.csv", help="CSV file written by --batch")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="Worker processes for --batch (each loads its own emotion model)")
+    parser.add_argument("--metrics", help="Write per-session hot-path metrics here: Prometheus text for .prom, JSON otherwise")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.batch:
+        return run_batch(args.batch, args.out, args.workers, args.metrics)
+    if args.video:
+        row = assess_recording(args.video, args.answers)
+        if args.metrics:
+            write_metrics(args.metrics, {row["session"]: row["metrics"]})
+        for column in BATCH_COLUMNS:
+            if row.get(column) not in (None, ""):
+                print(f"{column}: {row[column]}")
+        return 1 if row.get("error") else 0
+    run_interactive(args.metrics)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
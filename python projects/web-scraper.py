@@ -1,67 +1,839 @@
+import argparse
+import codecs
 import csv
-import tkinter as tk
-from tkinter import filedialog, messagebox
+import gzip
+import hashlib
+import io
+import json
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from itertools import accumulate, islice
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
 
-import customtkinter as ctk
-import pyperclip
 import requests
-from bs4 import BeautifulSoup
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+
+try:  # Optional faster parser backends
+    import lxml
+except ImportError:
+    lxml = None
+try:
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
 
 # Developer: Alok Kushwaha
 # Description: A modern web scraper application with a responsive GUI.
+# Usage:
+#   python web-scraper.py                                            (GUI)
+#   python web-scraper.py scrape --urls urls.txt --tags h1,p --out data.csv   (headless)
+# The GUI and PDF libraries are only imported when they are used, so headless runs do not need a display.
 
-# Function to scrape website data
-def scrape_website(url, tags):
-    try:
-        response = requests.get(url)
-        response.raise_for_status()  # Raise error for unsuccessful status codes
-        soup = BeautifulSoup(response.content, "html.parser")
-        extracted_data = {tag: [element.get_text(strip=True) for element in soup.find_all(tag)] for tag in tags}
-        if not extracted_data:
-            messagebox.showwarning("No Data", "No data found for the provided tags!")
+# Batch crawl limits
+MAX_IN_FLIGHT = 32  # Requests running at the same time across all hosts
+PER_HOST_LIMIT = 4  # Requests running at the same time against one host
+
+CHUNK_SIZE = 64 * 1024  # Bytes read at a time in streaming mode
+
+# Polite crawling defaults
+USER_AGENT = "web-scraper/1.0 (python-requests)"
+CONNECT_TIMEOUT = 5  # Seconds to wait for a connection
+READ_TIMEOUT = 30  # Seconds to wait between bytes of the response
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5  # Seconds; the backoff window doubles on every retry
+BACKOFF_MAX = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+HOST_RATE = 2.0  # Requests per second allowed against one host
+HOST_BURST = 4  # Requests a host may receive back to back before the rate applies
+ROBOTS_TTL = 3600  # Seconds a host's robots.txt is cached
+
+# Response cache defaults
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "web-scraper")
+CACHE_TTL = 300  # Seconds a cached page is reused without asking the server
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # Least recently used pages are evicted above this size
+
+# Export settings
+EXPORT_COLUMNS = ["url", "tag", "text", "scraped_at"]
+EXPORT_BUFFER_SIZE = 1024 * 1024  # Bytes buffered before each write to disk
+PARQUET_BATCH_ROWS = 50_000  # Rows held in memory before a Parquet row group is written
+EXPORT_FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet", ".pdf": "pdf"}
+COMPRESSIONS = {".gz": "gzip", ".zst": "zstd"}
+PDF_MARGIN = 40
+PDF_FONT_SIZE = 10
+PDF_LEADING = 13  # Distance between lines in points
+
+# GUI settings
+RENDER_CHUNK_LINES = 500  # Result lines inserted per UI tick
+SCRAPE_POLL_MS = 50  # How often the GUI checks whether a background scrape has finished
+
+_SELECTOR_CHARS = set(".#[]:>+~*= ")  # A tag containing any of these is treated as a CSS selector
+
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_NON_TEXT_TAGS = {"script", "style", "template"}  # Their contents are not part of the page text
+# Start tags that implicitly close an open element: tag -> (tags it closes, tags that stop the search)
+_IMPLIED_END = {
+    "li": ({"li"}, {"ul", "ol", "menu"}),
+    "dt": ({"dd", "dt"}, {"dl"}),
+    "dd": ({"dd", "dt"}, {"dl"}),
+    "td": ({"td", "th"}, {"tr", "table"}),
+    "th": ({"td", "th"}, {"tr", "table"}),
+    "tr": ({"tr"}, {"table", "tbody", "thead", "tfoot"}),
+    "tbody": ({"tbody", "thead", "tfoot"}, {"table"}),
+    "thead": ({"tbody", "thead", "tfoot"}, {"table"}),
+    "tfoot": ({"tbody", "thead", "tfoot"}, {"table"}),
+    "option": ({"option"}, {"select", "datalist", "optgroup"}),
+    "optgroup": ({"optgroup", "option"}, {"select"}),
+}
+# Block-level start tags that close an open <p>, and the elements a <p> cannot be closed across
+_CLOSES_P = {
+    "address", "article", "aside", "blockquote", "dd", "details", "div", "dl", "dt", "fieldset", "figcaption",
+    "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "menu", "nav",
+    "ol", "p", "pre", "section", "table", "ul",
+}
+_P_SCOPE = {"button", "caption", "object", "table", "td", "template", "th"}
+
+_session = None
+_session_lock = threading.Lock()
+_cache = None
+
+# Function to create a session that keeps connections alive between requests
+def create_session(pool_connections=MAX_IN_FLIGHT, pool_maxsize=PER_HOST_LIMIT):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+class RobotsDisallowed(requests.exceptions.RequestException):
+    """Raised when robots.txt does not allow fetching a URL."""
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() sleeps until the caller may send a request."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Take the token now (possibly going negative) so waiting callers queue up in order
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0
+            self._tokens -= 1
+        if wait:
+            time.sleep(wait)
+
+class CrawlScheduler:
+    """Drop-in for a session's get() that adds timeouts, retries with backoff, per-host rate limits and robots.txt."""
+
+    def __init__(self, session=None, rate=HOST_RATE, burst=HOST_BURST, max_retries=MAX_RETRIES,
+                 timeout=(CONNECT_TIMEOUT, READ_TIMEOUT), respect_robots=True, user_agent=USER_AGENT):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be above 0 and burst at least 1")
+        if max_retries < 0:
+            raise ValueError("max_retries must not be negative")
+        if any(value is not None and value <= 0 for value in (timeout if isinstance(timeout, tuple) else (timeout,))):
+            raise ValueError("timeouts must be above 0")
+        self.session = session or create_session()
+        self.session.headers["User-Agent"] = user_agent
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self._buckets = {}
+        self._robots = {}  # origin -> (RobotFileParser, fetched at)
+        self._host_locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        if self.respect_robots and not self.allowed(url):
+            raise RobotsDisallowed(f"Blocked by robots.txt: {url}")
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc.lower()
+        for attempt in range(self.max_retries + 1):
+            self._bucket(host).acquire()
+            try:
+                response = self.session.get(url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                delay = max(self._backoff(attempt), self._retry_after(response))
+                response.close()
+            time.sleep(delay)
+
+    def allowed(self, url):
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc.lower()}"
+        with self._lock:
+            host_lock = self._host_locks.setdefault(origin, threading.Lock())
+        with host_lock:  # Only one thread downloads a host's robots.txt
+            cached = self._robots.get(origin)
+            if cached is None or time.monotonic() - cached[1] > ROBOTS_TTL:
+                cached = self._robots[origin] = (self._fetch_robots(origin), time.monotonic())
+        robots = cached[0]
+        delay = robots.crawl_delay(self.user_agent)
+        if delay:
+            bucket = self._bucket(parts.netloc.lower())
+            bucket.rate = min(bucket.rate, 1 / float(delay))
+        return robots.can_fetch(self.user_agent, url)
+
+    def _fetch_robots(self, origin):
+        robots = RobotFileParser(origin + "/robots.txt")
+        try:
+            self._bucket(urlsplit(origin).netloc).acquire()
+            response = self.session.get(origin + "/robots.txt", timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            robots.allow_all = True  # An unreachable robots.txt should not stop the crawl
+            return robots
+        if response.status_code in (401, 403):
+            robots.disallow_all = True
+        elif response.status_code >= 400:
+            robots.allow_all = True
+        else:
+            robots.parse(response.text.splitlines())
+        return robots
+
+    def _bucket(self, host):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def _backoff(self, attempt):
+        # "Full jitter": a random delay up to the exponential cap spreads retries from many workers
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+    def _retry_after(self, response):
+        try:
+            return min(BACKOFF_MAX, float(response.headers.get("Retry-After", 0)))
+        except ValueError:  # HTTP-date form is not worth parsing here
+            return 0
+
+# Function to get the shared (polite) session used when no session is passed in
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = CrawlScheduler(create_session())
+        return _session
+
+class ResponseCache:
+    """On-disk HTTP response cache with ETag / Last-Modified revalidation, a TTL and an LRU size cap."""
+
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES, vary_headers=("Accept", "Accept-Language")):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.vary_headers = vary_headers
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def key(self, url, headers=None):
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        parts = [url] + [f"{name.lower()}:{headers.get(name.lower(), '')}" for name in self.vary_headers]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return (metadata, body path) for a cached response, or None."""
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as file:
+                meta = json.load(file)
+            os.utime(body_path)  # Mark as recently used for LRU eviction
+        except (OSError, ValueError):
+            return None
+        return meta, body_path
+
+    def is_fresh(self, meta):
+        return time.time() - meta["stored_at"] < self.ttl
+
+    def store(self, key, response):
+        """Save a 200 response unless the server asked for it not to be stored."""
+        if "no-store" in response.headers.get("Cache-Control", "").lower():
+            return
+        body_path, meta_path = self._paths(key)
+        meta = {
+            "url": response.url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "stored_at": time.time(),
+        }
+        old_size = os.path.getsize(body_path) if os.path.exists(body_path) else 0
+        self._write_atomic(body_path, response.content)
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        with self._lock:
+            self._total_bytes += len(response.content) - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def refresh(self, key, meta):
+        """Restart the TTL of an entry the server confirmed is unchanged (304)."""
+        meta["stored_at"] = time.time()
+        self._write_atomic(self._paths(key)[1], json.dumps(meta).encode("utf-8"))
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key)
+        return base + ".body", base + ".json"
+
+    def _entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".body"):
+                stat = entry.stat()
+                yield entry.path, stat.st_size, stat.st_mtime
+
+    def _write_atomic(self, path, data):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+
+    def _evict(self):
+        # Remove least recently used entries until the cache is back under its size cap
+        for body_path, size, _ in sorted(self._entries(), key=lambda entry: entry[2]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            for path in (body_path, body_path[:-len(".body")] + ".json"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._total_bytes -= size
+
+# Function to get the shared response cache used by the GUI
+def get_cache():
+    global _cache
+    with _session_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
+
+# Function to split requested tags into plain tag names and CSS selectors
+def split_tags(tags):
+    names, selectors = [], []
+    for tag in tags:
+        (selectors if any(char in _SELECTOR_CHARS for char in tag) else names).append(tag)
+    return names, selectors
+
+# Function to check that the tags can be extracted in streaming mode (raises ValueError for CSS selectors)
+def check_stream_tags(tags):
+    _, selectors = split_tags(tags)
+    if selectors:
+        raise ValueError(f"CSS selectors are not supported in streaming mode: {', '.join(selectors)}")
+
+# Function to pick the fastest installed parser backend
+def default_parser():
+    if SelectolaxParser is not None:
+        return "selectolax"
+    if lxml is not None:
+        return "lxml"
+    return "html.parser"
+
+# Function to check that a chosen parser backend is installed (raises ValueError otherwise)
+def check_parser(parser):
+    if (parser == "selectolax" and SelectolaxParser is None) or (parser == "lxml" and lxml is None):
+        raise ValueError(f"The {parser} parser is not installed")
+
+# Function to extract the text of every requested tag (or CSS selector) from a page in one pass
+def extract_tags(content, tags, parser=None):
+    parser = parser or default_parser()
+    extracted_data = {tag: [] for tag in tags}
+    names, selectors = split_tags(extracted_data)
+    by_name = {}
+    for name in names:
+        by_name.setdefault(name.lower(), []).append(extracted_data[name])
+
+    if parser == "selectolax":
+        tree = SelectolaxParser(content)
+        matches = []  # (result list, node) in the order each query returns them
+        if names:
+            # A grouped selector matches every requested tag in a single walk, in document order
+            for node in tree.css(", ".join(by_name)):
+                matches.extend((texts, node) for texts in by_name.get(node.tag, ()))
+        for selector in selectors:
+            matches.extend((extracted_data[selector], node) for node in tree.css(selector))
+        # Unlike get_text(), node.text() includes script and style code, so read any of those that were requested
+        # and then drop them from the tree before reading the text of everything else
+        texts_of = [node.text(separator="", strip=True) if node.tag in _NON_TEXT_TAGS else None for _, node in matches]
+        tree.strip_tags(list(_NON_TEXT_TAGS))
+        for (texts, node), text in zip(matches, texts_of):
+            texts.append(node.text(separator="", strip=True) if text is None else text)
         return extracted_data
+
+    # Without selectors only the requested tags need to be built into the tree. lxml closes implied end tags
+    # itself; html.parser relies on the container tags the strainer would drop, so it always builds the full tree.
+    parse_only = SoupStrainer(list(by_name)) if parser == "lxml" and names and not selectors else None
+    soup = BeautifulSoup(content, parser, parse_only=parse_only)
+    if names:
+        for element in soup.find_all(list(by_name)):
+            text = element.get_text(strip=True)
+            for texts in by_name[element.name]:
+                texts.append(text)
+    for selector in selectors:
+        extracted_data[selector] = [element.get_text(strip=True) for element in soup.select(selector)]
+    return extracted_data
+
+class TagTextCollector(HTMLParser):
+    """Incremental parser that keeps only the text of the requested tags and discards everything else."""
+
+    def __init__(self, tags):
+        super().__init__()
+        self.extracted_data = {tag: [] for tag in tags}
+        self._wanted = {}
+        for tag, texts in self.extracted_data.items():
+            self._wanted.setdefault(tag.lower(), []).append(texts)
+        # Every open element, so end tags and implied end tags close what a browser would close
+        self._stack = []  # (tag, entry in self._open or None)
+        self._open = []  # (tag, text parts, result slots) for every requested tag still open
+        self._skip_depth = 0
+        self._pending = []  # Text between two tags, which may arrive split across chunks
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        if tag in _CLOSES_P:
+            self._close_nearest({"p"}, _P_SCOPE)
+        if tag in _IMPLIED_END:
+            self._close_nearest(*_IMPLIED_END[tag])
+
+        entry = None
+        if tag in self._wanted:
+            # Reserve the result slot now so nested matches keep document order
+            slots = []
+            for texts in self._wanted[tag]:
+                texts.append("")
+                slots.append((texts, len(texts) - 1))
+            if tag not in _VOID_TAGS:
+                entry = (tag, [], slots)
+                self._open.append(entry)
+        if tag not in _VOID_TAGS:
+            self._stack.append((tag, entry))
+            if tag in _NON_TEXT_TAGS:
+                self._skip_depth += 1
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                self._pop_to(index)  # Close this tag and anything left unclosed inside it
+                break
+
+    def handle_data(self, data):
+        if self._open and not self._skip_depth:
+            self._pending.append(data)
+
+    def close(self):
+        super().close()
+        self._flush_text()
+        self._pop_to(0)
+
+    def _close_nearest(self, tags, boundaries):
+        for index in range(len(self._stack) - 1, -1, -1):
+            tag = self._stack[index][0]
+            if tag in tags:
+                self._pop_to(index)
+                return
+            if tag in boundaries:
+                return
+
+    def _pop_to(self, index):
+        while len(self._stack) > index:
+            tag, entry = self._stack.pop()
+            if tag in _NON_TEXT_TAGS:
+                self._skip_depth -= 1
+            if entry is not None:
+                self._finish(self._open.pop())
+
+    def _flush_text(self):
+        if self._pending:
+            text = "".join(self._pending).strip()
+            self._pending.clear()
+            if text:
+                for _, parts, _ in self._open:
+                    parts.append(text)
+
+    def _finish(self, entry):
+        _, parts, slots = entry
+        text = "".join(parts)
+        for texts, index in slots:
+            texts[index] = text
+
+# Function to get the charset a response declares, defaulting to UTF-8
+def response_encoding(response):
+    content_type = response.headers.get("Content-Type", "")
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.partition("=")
+        if key.strip().lower() == "charset":
+            encoding = value.strip().strip('"\'')
+            try:
+                codecs.lookup(encoding)
+                return encoding
+            except LookupError:
+                break
+    return "utf-8"
+
+# Function to extract the requested tags from a stream of byte chunks without building a full tree
+def stream_extract(chunks, tags, encoding="utf-8"):
+    check_stream_tags(tags)
+    collector = TagTextCollector(tags)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in chunks:
+        collector.feed(decoder.decode(chunk))
+    collector.feed(decoder.decode(b"", final=True))
+    collector.close()
+    return collector.extracted_data
+
+# Function to fetch a page body, reusing and revalidating a cached copy when a cache is given
+def fetch_page(url, session=None, cache=None, headers=None):
+    session = session or get_session()
+    if cache is None:
+        response = session.get(url, headers=headers)
+        response.raise_for_status()  # Raise error for unsuccessful status codes
+        return response.content
+
+    key = cache.key(url, headers)
+    entry = cache.get(key)
+    request_headers = dict(headers or {})
+    if entry:
+        meta, body_path = entry
+        if not cache.is_fresh(meta):
+            # Ask the server whether our copy is still current
+            if meta.get("etag"):
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+            response = session.get(url, headers=request_headers)
+            if response.status_code != 304:
+                response.raise_for_status()
+                cache.store(key, response)
+                return response.content
+            cache.refresh(key, meta)
+        with open(body_path, "rb") as file:
+            return file.read()
+
+    response = session.get(url, headers=request_headers)
+    response.raise_for_status()
+    cache.store(key, response)
+    return response.content
+
+# Function to fetch one page and extract the requested tags (raises on failure)
+def fetch_and_extract(url, tags, session=None, parser=None, stream=False, cache=None):
+    session = session or get_session()
+    if stream:
+        check_stream_tags(tags)  # Before the request, not after the page has been downloaded
+        # Read the body in chunks and keep only the requested text, so memory does not grow with page size.
+        # Streamed pages are never cached since that would mean holding or writing the whole body.
+        with session.get(url, stream=True) as response:
+            response.raise_for_status()
+            return stream_extract(response.iter_content(CHUNK_SIZE), tags, response_encoding(response))
+    check_parser(parser)
+    return extract_tags(fetch_page(url, session, cache), tags, parser)
+
+class ScrapeError(Exception):
+    """Raised when a page cannot be scraped."""
+
+# Function to scrape website data (raises ScrapeError instead of showing dialogs)
+def scrape_website(url, tags, **options):
+    try:
+        return fetch_and_extract(url, tags, **options)
     except requests.exceptions.RequestException as e:
-        messagebox.showerror("Error", f"Error fetching the page: {e}")
-        return None
+        raise ScrapeError(f"Error fetching the page: {e}") from e
 
-# Function to save data to a CSV file
-def save_data_to_csv(data, filename):
+# Function to turn "h1, p, div" into a list of tags
+def parse_tags(text):
+    return [tag.strip() for tag in text.split(",") if tag.strip()]
+
+# Function to parse a command-line count that must be at least 1
+def positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+# Function to parse a command-line count that may be 0 but not negative
+def non_negative_int(text):
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {value}")
+    return value
+
+# Function to parse a command-line rate or duration that must be above 0
+def positive_float(text):
+    value = float(text)
+    if not value > 0:  # Also rejects nan
+        raise argparse.ArgumentTypeError(f"must be above 0, got {text}")
+    return value
+
+# Function to read URLs from a seed file (one per line, '#' starts a comment)
+def load_urls(filename):
+    with open(filename, encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip() and not line.lstrip().startswith("#")]
+
+def _fetch_result(session, url, tags, fetch_options):
     try:
-        with open(filename, mode="w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerow(["Tag", "Extracted Text"])
-            for tag, texts in data.items():
-                for text in texts:
-                    writer.writerow([tag, text])
-        messagebox.showinfo("Success", f"Data saved to {filename}")
-    except Exception as e:
-        messagebox.showerror("Error", f"Error saving data to CSV: {e}")
+        return scrape_website(url, tags, session=session, **fetch_options), None
+    except ScrapeError as e:
+        return None, e
+    except Exception as e:  # A parser, cache or other failure on one page must not end the whole crawl
+        return None, ScrapeError(f"Error scraping the page: {e}")
+
+# Function to scrape many URLs concurrently, yielding (url, data, error) as each page finishes.
+# Extra keyword arguments (parser, stream, cache) are passed on to fetch_and_extract.
+def crawl(urls, tags, max_in_flight=MAX_IN_FLIGHT, per_host_limit=PER_HOST_LIMIT, session=None, **fetch_options):
+    if max_in_flight < 1 or per_host_limit < 1:
+        raise ValueError("max_in_flight and per_host_limit must be at least 1")
+    if fetch_options.get("stream"):
+        check_stream_tags(tags)
+    check_parser(fetch_options.get("parser"))
+    session = session or get_session()
+
+    # Group URLs by host so one slow host cannot take every worker
+    pending = {}
+    for url in urls:
+        pending.setdefault(urlsplit(url).netloc.lower(), deque()).append(url)
+    active = dict.fromkeys(pending, 0)
+    in_flight = {}
+
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        while pending or in_flight:
+            for host in list(pending):
+                host_urls = pending[host]
+                while host_urls and active[host] < per_host_limit and len(in_flight) < max_in_flight:
+                    url = host_urls.popleft()
+                    in_flight[pool.submit(_fetch_result, session, url, tags, fetch_options)] = (url, host)
+                    active[host] += 1
+                if not host_urls:
+                    del pending[host]
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                url, host = in_flight.pop(future)
+                active[host] -= 1
+                data, error = future.result()
+                yield url, data, error
+
+# Function to scrape many URLs concurrently and collect {url: {tag: [texts]}} (None for failed pages)
+def scrape_websites(urls, tags, **options):
+    return {url: data for url, data, _ in crawl(urls, tags, **options)}
+
+# Function to open an output file for writing, compressed with gzip or zstd if asked
+def open_output(filename, compression=None):
+    if compression == "gzip":
+        return gzip.open(filename, "wb", compresslevel=6)
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor().stream_writer(open(filename, "wb", buffering=EXPORT_BUFFER_SIZE), closefd=True)
+    return open(filename, "wb", buffering=EXPORT_BUFFER_SIZE)
+
+class RowWriter:
+    """Writes (url, tag, text, scraped_at) rows as pages arrive, so memory does not grow with the crawl."""
+
+    def write_page(self, url, data, scraped_at=None):
+        scraped_at = scraped_at or datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self.write_rows((url, tag, text, scraped_at) for tag, texts in data.items() for text in texts)
+
+    def write_rows(self, rows):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class CsvRowWriter(RowWriter):
+    def __init__(self, filename, compression=None):
+        self._file = io.TextIOWrapper(open_output(filename, compression), encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(EXPORT_COLUMNS)
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+class JsonlRowWriter(RowWriter):
+    def __init__(self, filename, compression=None):
+        self._file = io.TextIOWrapper(open_output(filename, compression), encoding="utf-8")
+
+    def write_rows(self, rows):
+        self._file.writelines(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False) + "\n" for row in rows)
+
+    def close(self):
+        self._file.close()
+
+class ParquetRowWriter(RowWriter):
+    """Columnar output through pyarrow, written in row groups of PARQUET_BATCH_ROWS."""
+
+    def __init__(self, filename, compression=None):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.schema([(column, pa.string()) for column in EXPORT_COLUMNS])
+        self._writer = pq.ParquetWriter(filename, self._schema, compression=compression or "snappy")
+        self._columns = [[] for _ in EXPORT_COLUMNS]
+
+    def write_rows(self, rows):
+        for row in rows:
+            for column, value in zip(self._columns, row):
+                column.append(value)
+        if len(self._columns[0]) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+    def _flush(self):
+        if self._columns[0]:
+            self._writer.write_table(self._pa.Table.from_arrays(self._columns, schema=self._schema))
+            self._columns = [[] for _ in EXPORT_COLUMNS]
+
+class PdfRowWriter(RowWriter):
+    """Paginated PDF output. Long lines are wrapped and each page is drawn as one text object."""
+
+    def __init__(self, filename, compression=None):
+        # PDF pages are always compressed internally, so the compression option is not used
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+        from reportlab.pdfgen import canvas
+
+        self._string_width = stringWidth
+        self._char_widths = {}  # font -> {char: width at size 1}, so wrapping never calls stringWidth per word
+        self._canvas = canvas.Canvas(filename, pagesize=letter, pageCompression=1)
+        self._width, self._height = letter
+        self._text = None
+        self._last_url = self._last_tag = None
+        self._new_page()
+        self._line("Scraped Data", "Helvetica-Bold", 0, size=16, leading=24)
+
+    def write_rows(self, rows):
+        for url, tag, text, _ in rows:
+            if url != self._last_url:
+                if url:
+                    self._line(url, "Helvetica-Bold", 0)
+                self._last_url, self._last_tag = url, None
+            if tag != self._last_tag:
+                self._line(f"{tag}:", "Helvetica-Bold", 10)
+                self._last_tag = tag
+            self._line(f"- {text}", "Helvetica", 30)
+
+    def close(self):
+        self._canvas.drawText(self._text)
+        self._canvas.save()
+
+    def _new_page(self):
+        if self._text is not None:
+            self._canvas.drawText(self._text)
+            self._canvas.showPage()
+        self._text = self._canvas.beginText()
+        self._font = self._cursor = None
+        self._y = self._height - PDF_MARGIN
+
+    def _line(self, text, font, indent, size=PDF_FONT_SIZE, leading=PDF_LEADING):
+        x = PDF_MARGIN + indent
+        for part in self._wrap(text, font, (self._width - PDF_MARGIN - x) / size):
+            if self._y - leading < PDF_MARGIN:
+                self._new_page()
+            self._y -= leading
+            if self._font != (font, size):
+                self._text.setFont(font, size)
+                self._font = (font, size)
+            # Consecutive lines at the same indent just advance by the leading, which keeps the page stream small
+            if self._cursor != (x, leading):
+                self._text.setLeading(leading)
+                self._text.setTextOrigin(x, self._y)
+                self._cursor = (x, leading)
+            self._text.textLine(part)
+
+    def _wrap(self, text, font, max_width):
+        # Greedy word wrap using cumulative character widths at font size 1
+        if not text:
+            return [""]
+        if "\n" in text or "\t" in text:
+            text = " ".join(text.split())
+        widths = self._char_widths.setdefault(font, {})
+        for char in set(text) - widths.keys():
+            widths[char] = self._string_width(char, font, 1)
+        cumulative = list(accumulate(map(widths.__getitem__, text)))
+        if cumulative[-1] <= max_width:
+            return [text]
+
+        lines, start, offset = [], 0, 0.0
+        while start < len(text):
+            end = bisect_right(cumulative, offset + max_width, start)  # text[start:end] fits on the line
+            if end >= len(text):
+                lines.append(text[start:])
+                break
+            space = text.rfind(" ", start, end + 1)
+            if space > start:
+                lines.append(text[start:space])
+                start = space + 1
+            else:  # A single word wider than the line is split by character
+                end = max(end, start + 1)
+                lines.append(text[start:end])
+                start = end
+            while start < len(text) and text[start] == " ":
+                start += 1
+            offset = cumulative[start - 1]
+        return lines
+
+# Function to open a row writer, picking format and compression from the file name when not given
+# (e.g. data.csv, data.jsonl.gz, data.parquet)
+def open_writer(filename, fmt=None, compression=None):
+    stem, extension = os.path.splitext(filename.lower())
+    if extension in COMPRESSIONS:
+        compression = compression or COMPRESSIONS[extension]
+        stem, extension = os.path.splitext(stem)
+    fmt = fmt or EXPORT_FORMATS.get(extension, "csv")
+    writers = {"csv": CsvRowWriter, "jsonl": JsonlRowWriter, "parquet": ParquetRowWriter, "pdf": PdfRowWriter}
+    return writers[fmt](filename, compression)
+
+# Function to save data to a CSV file
+def save_data_to_csv(data, filename, url=""):
+    with open_writer(filename, "csv") as writer:
+        writer.write_page(url, data)
 
 # Function to save data to a PDF file
-def save_data_to_pdf(data, filename):
-    try:
-        c = canvas.Canvas(filename, pagesize=letter)
-        width, height = letter
-        c.setFont("Helvetica-Bold", 16)
-        c.drawString(30, height - 40, "Scraped Data")
-        y_position = height - 60
-        for tag, texts in data.items():
-            c.setFont("Helvetica", 12)
-            c.drawString(30, y_position, f"{tag}:")
-            y_position -= 20
-            for text in texts:
-                c.drawString(50, y_position, f"- {text}")
-                y_position -= 15
-            y_position -= 10
-        c.save()
-        messagebox.showinfo("Success", f"Data saved to {filename}")
-    except Exception as e:
-        messagebox.showerror("Error", f"Error saving data to PDF: {e}")
+def save_data_to_pdf(data, filename, url=""):
+    with open_writer(filename, "pdf") as writer:
+        writer.write_page(url, data)
 
 # Function to copy data to clipboard
 def copy_to_clipboard(content_widget):
+    from tkinter import messagebox
+
+    import pyperclip
+
     content = content_widget.get("1.0", "end-1c").strip()
     if content:
         pyperclip.copy(content)
@@ -71,27 +843,76 @@ def copy_to_clipboard(content_widget):
 
 # Main GUI function
 def run_gui():
+    import tkinter as tk
+    from tkinter import filedialog, messagebox
+
+    import customtkinter as ctk
+
     def on_scrape_button_click():
         url = url_entry.get().strip()
-        tags = tags_entry.get().strip().split(',')
+        tags = parse_tags(tags_entry.get())
         if url and tags:
-            extracted_data = scrape_website(url, tags)
-            if extracted_data:
-                display_scraped_data(extracted_data)
-                global data_scraped
-                data_scraped = extracted_data
-            else:
-                data_scraped = None
+            # Fetch on a worker thread so the window keeps responding while the page downloads
+            results = queue.Queue()
+            threading.Thread(target=scrape_in_background, args=(url, tags, results), daemon=True).start()
+            scrape_button.configure(state="disabled", text="Scraping...")
+            status_label.configure(text=f"Fetching {url} ...")
+            root.after(SCRAPE_POLL_MS, check_scrape_result, url, results)
         else:
             messagebox.showwarning("Input Error", "Please provide both URL and tags.")
 
+    def scrape_in_background(url, tags, results):
+        try:
+            results.put((scrape_website(url, tags, cache=get_cache()), None))
+        except ScrapeError as e:
+            results.put((None, e))
+        except Exception as e:  # A bad selector, parser or cache error must still reach the dialog
+            results.put((None, ScrapeError(f"Error scraping the page: {e}")))
+
+    def check_scrape_result(url, results):
+        global data_scraped, data_url
+        try:
+            extracted_data, error = results.get_nowait()
+        except queue.Empty:
+            root.after(SCRAPE_POLL_MS, check_scrape_result, url, results)
+            return
+        scrape_button.configure(state="normal", text="Scrape Website")
+        if error:
+            status_label.configure(text="")
+            messagebox.showerror("Error", str(error))
+            data_scraped = None
+            return
+        if not any(extracted_data.values()):
+            messagebox.showwarning("No Data", "No data found for the provided tags!")
+        display_scraped_data(extracted_data)
+        data_scraped = extracted_data
+        data_url = url
+
     def display_scraped_data(data):
+        nonlocal render_job
+        if render_job is not None:
+            root.after_cancel(render_job)
         result_text.delete("1.0", "end")
+        total_rows = sum(len(texts) for texts in data.values())
+        render_job = root.after(0, render_chunk, iter_result_lines(data), 0, total_rows)
+
+    def iter_result_lines(data):
+        # Yields (line, rows in line) so the counter only counts extracted texts
         for idx, (tag, texts) in enumerate(data.items(), 1):
-            result_text.insert("end", f"Tag {idx} ({tag}):\n")
+            yield f"Tag {idx} ({tag}):\n", 0
             for text in texts:
-                result_text.insert("end", f"  • {text}\n")
-            result_text.insert("end", "\n")
+                yield f"  • {text}\n", 1
+            yield "\n", 0
+
+    def render_chunk(lines, shown_rows, total_rows):
+        # Insert a batch of lines per tick and hand control back to Tk between batches
+        nonlocal render_job
+        chunk = list(islice(lines, RENDER_CHUNK_LINES))
+        if chunk:
+            result_text.insert("end", "".join(line for line, _ in chunk))
+            shown_rows += sum(rows for _, rows in chunk)
+        status_label.configure(text=f"Rows: {shown_rows:,} / {total_rows:,}")
+        render_job = root.after(1, render_chunk, lines, shown_rows, total_rows) if chunk else None
 
     def save_as_csv():
         if data_scraped is None:
@@ -99,7 +920,11 @@ def run_gui():
             return
         file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
         if file_path:
-            save_data_to_csv(data_scraped, file_path)
+            try:
+                save_data_to_csv(data_scraped, file_path, data_url)
+                messagebox.showinfo("Success", f"Data saved to {file_path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error saving data to CSV: {e}")
 
     def save_as_pdf():
         if data_scraped is None:
@@ -107,13 +932,19 @@ def run_gui():
             return
         file_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF Files", "*.pdf")])
         if file_path:
-            save_data_to_pdf(data_scraped, file_path)
+            try:
+                save_data_to_pdf(data_scraped, file_path, data_url)
+                messagebox.showinfo("Success", f"Data saved to {file_path}")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error saving data to PDF: {e}")
 
     def exit_app():
         root.destroy()
 
-    global data_scraped
+    global data_scraped, data_url
     data_scraped = None
+    data_url = ""
+    render_job = None  # Pending after() call of the results renderer
 
     # Main Window
     root = ctk.CTk()
@@ -165,7 +996,9 @@ def run_gui():
 
     # Scrape Button
     scrape_button = ctk.CTkButton(scrollable_frame, text="Scrape Website", command=on_scrape_button_click, width=int(screen_width * 0.2), corner_radius=10)
-    scrape_button.pack(pady=20)
+    scrape_button.pack(pady=(20, 5))
+    status_label = ctk.CTkLabel(scrollable_frame, text="", font=("Roboto", 14), text_color="#BBBBBB")
+    status_label.pack(pady=(0, 5))
 
     # Display Scraped Data
     result_text = ctk.CTkTextbox(scrollable_frame, width=int(screen_width * 0.75), height=int(screen_height * 0.4), corner_radius=10, fg_color="#1B1B1B", text_color="#FFFFFF")
@@ -186,5 +1019,68 @@ def run_gui():
     # Start the GUI
     root.mainloop()
 
-if __name__ == "__main__":
+# Function to parse command-line arguments
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape tag text from web pages. Opens the GUI when no command is given.")
+    subparsers = parser.add_subparsers(dest="command")
+    subparsers.add_parser("gui", help="Open the GUI (default)")
+
+    scrape = subparsers.add_parser("scrape", help="Scrape pages without the GUI and save the results")
+    scrape.add_argument("--urls", help="File with one URL per line")
+    scrape.add_argument("--url", action="append", default=[], help="URL to scrape (can be repeated)")
+    scrape.add_argument("--tags", required=True, type=parse_tags, help="Comma-separated tags or CSS selectors, e.g. h1,p")
+    scrape.add_argument("--out", required=True, help="Output file; format and compression follow the extension (.csv, .jsonl, .parquet, .pdf, + .gz/.zst)")
+    scrape.add_argument("--format", choices=["csv", "jsonl", "parquet", "pdf"], help="Output format (overrides the extension)")
+    scrape.add_argument("--compression", choices=["gzip", "zstd"], help="Compress the output")
+    scrape.add_argument("--parser", choices=["selectolax", "lxml", "html.parser"], help="Parser backend (default: fastest installed)")
+    scrape.add_argument("--stream", action="store_true", help="Parse pages while downloading to keep memory flat")
+    scrape.add_argument("--max-in-flight", type=positive_int, default=MAX_IN_FLIGHT, help="Concurrent requests overall")
+    scrape.add_argument("--per-host", type=positive_int, default=PER_HOST_LIMIT, help="Concurrent requests per host")
+    scrape.add_argument("--rate", type=positive_float, default=HOST_RATE, help="Requests per second per host")
+    scrape.add_argument("--retries", type=non_negative_int, default=MAX_RETRIES, help="Retries for timeouts, 429 and 5xx responses")
+    scrape.add_argument("--timeout", type=positive_float, default=READ_TIMEOUT, help="Seconds to wait for a response")
+    scrape.add_argument("--ignore-robots", action="store_true", help="Do not check robots.txt")
+    scrape.add_argument("--cache-dir", default=CACHE_DIR, help="Response cache directory")
+    scrape.add_argument("--cache-ttl", type=float, default=CACHE_TTL, help="Seconds to reuse a cached page without revalidating")
+    scrape.add_argument("--no-cache", action="store_true", help="Always download pages")
+    return parser.parse_args(argv)
+
+# Function to run a headless scrape from the command line
+def run_cli(args):
+    urls = args.url + (load_urls(args.urls) if args.urls else [])
+    if not urls or not args.tags:
+        print("Error: provide at least one URL (--url or --urls) and one tag.", file=sys.stderr)
+        return 2
+    try:
+        if args.stream:
+            check_stream_tags(args.tags)
+        check_parser(args.parser)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    cache = None if args.no_cache else ResponseCache(args.cache_dir, args.cache_ttl)
+    session = CrawlScheduler(create_session(pool_maxsize=args.per_host), rate=args.rate, max_retries=args.retries,
+                             timeout=(CONNECT_TIMEOUT, args.timeout), respect_robots=not args.ignore_robots)
+    failures = 0
+    with open_writer(args.out, args.format, args.compression) as writer:
+        for url, data, error in crawl(urls, args.tags, max_in_flight=args.max_in_flight, per_host_limit=args.per_host,
+                                      session=session, parser=args.parser, stream=args.stream, cache=cache):
+            if error:
+                failures += 1
+                print(f"{url}: {error}", file=sys.stderr)
+                continue
+            writer.write_page(url, data)
+
+    print(f"Scraped {len(urls) - failures}/{len(urls)} pages into {args.out}")
+    return 1 if failures else 0
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "scrape":
+        return run_cli(args)
     run_gui()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())